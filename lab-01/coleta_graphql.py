@@ -1,9 +1,12 @@
 # coleta_graphql.py
 import os
 import requests
-import csv
+import hashlib
+import json
 import time
-from datetime import datetime, timezone
+import orjson
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 # Carrega variáveis de ambiente do arquivo .env
@@ -27,11 +30,59 @@ REPOS_PER_PAGE = 100
 PAGES_TO_FETCH = 10
 MAX_RETRIES = 3
 RETRY_DELAY = 5
+DETAILS_BATCH_SIZE = 20
+# Colunas do DataFrame processado -> nome da coluna no CSV final
+CSV_COLUMNS = {
+    "nameWithOwner": "nome_repositorio",
+    "stargazerCount": "estrelas",
+    "primaryLanguage.name": "linguagem_primaria",
+    "idade_dias": "idade_dias",
+    "dias_desde_ultimo_push": "dias_desde_ultimo_push",
+    "pullRequests.totalCount": "total_pull_requests_aceitas",
+    "releases.totalCount": "total_releases",
+    "razao_issues_fechadas": "razao_issues_fechadas",
+}
+# Abaixo deste número de pontos restantes, as requisições passam a ser espaçadas
+RATE_LIMIT_LOW_WATERMARK = 20
+# Checkpoint da paginação (permite retomar uma coleta interrompida)
+CHECKPOINT_FILE = ".cursor"
+# Cache em disco das respostas da API (evita re-consultar tudo ao rodar de novo)
+CACHE_DIR = ".cache_graphql"
+CACHE_TTL_SECONDS = 24 * 60 * 60
+# Limite de lotes em voo ao mesmo tempo (respeita o rate limit secundário do GitHub)
+MAX_CONCURRENT_REQUESTS = 8
+
+# Sessão reutilizada em todas as queries: mantém a conexão TLS aberta (keep-alive)
+# em vez de abrir uma nova conexão por requisição.
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount(
+    "https://",
+    requests.adapters.HTTPAdapter(
+        pool_connections=1, pool_maxsize=MAX_CONCURRENT_REQUESTS
+    ),
+)
+
+# Campos "pesados" de cada repositório. São reaproveitados tanto na busca
+# paginada quanto em cada alias (r0, r1, ...) da query de detalhes em lote.
+REPO_DETAILS_FRAGMENT = """
+fragment RepoDetails on Repository {
+  pullRequests(states: MERGED) {
+    totalCount
+  }
+  releases {
+    totalCount
+  }
+  closedIssues: issues(states: CLOSED) {
+    totalCount
+  }
+  totalIssues: issues {
+    totalCount
+  }
+}
+"""
 
-# --- MUDANÇA: Query dividida em duas para maior robustez ---
-
-# Query 1: Busca "leve" para obter a lista de repositórios
-SEARCH_REPOS_QUERY = """
+_SEARCH_REPOS_TEMPLATE = """
 query SearchPopularRepos($cursor: String, $reposPerPage: Int!) {
   search(query: "stars:>=1 sort:stars-desc", type: REPOSITORY, first: $reposPerPage, after: $cursor) {
     repositoryCount
@@ -47,42 +98,121 @@ query SearchPopularRepos($cursor: String, $reposPerPage: Int!) {
         pushedAt
         primaryLanguage {
           name
-        }
+        }%s
       }
     }
   }
 }
 """
 
-# Query 2: Busca "pesada" para obter detalhes de UM repositório por vez
-GET_REPO_DETAILS_QUERY = """
-query GetRepoDetails($owner: String!, $name: String!) {
-  repository(owner: $owner, name: $name) {
-    pullRequests(states: MERGED) {
-      totalCount
-    }
-    releases {
-      totalCount
-    }
-    closedIssues: issues(states: CLOSED) {
-      totalCount
-    }
-    totalIssues: issues {
-      totalCount
-    }
-  }
-}
-"""
+# Query 1: Busca paginada que já traz os detalhes de cada repositório
+SEARCH_REPOS_QUERY = (
+    _SEARCH_REPOS_TEMPLATE % "\n        ...RepoDetails" + REPO_DETAILS_FRAGMENT
+)
+
+# Query 1 (fallback): Busca "leve", usada quando a página completa é rejeitada
+# pela API (timeout/complexidade). Os detalhes são buscados depois, em lote.
+SEARCH_REPOS_LIGHT_QUERY = _SEARCH_REPOS_TEMPLATE % ""
+
+
+def build_batched_details_query(batch):
+    """Monta uma única query GraphQL com um alias `rN` por repositório do lote.
+
+    Retorna a query e o dicionário de variáveis (`oN`/`nN` para owner/name).
+    """
+    params = []
+    fields = []
+    variables = {}
+    for i, (owner, name) in enumerate(batch):
+        params.append(f"$o{i}: String!, $n{i}: String!")
+        fields.append(
+            f"  r{i}: repository(owner: $o{i}, name: $n{i}) {{ ...RepoDetails }}"
+        )
+        variables[f"o{i}"] = owner
+        variables[f"n{i}"] = name
+    query = (
+        f"query Batch({', '.join(params)}) {{\n"
+        + "\n".join(fields)
+        + "\n}\n"
+        + REPO_DETAILS_FRAGMENT
+    )
+    return query, variables
+
+
+def _rate_limit_wait(response):
+    """Calcula quantos segundos aguardar a partir dos headers de rate limit.
+
+    Retorna None se a resposta não indicar limite de requisições.
+    """
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        return float(retry_after)
+    if response.headers.get("X-RateLimit-Remaining") == "0":
+        reset_at = float(response.headers.get("X-RateLimit-Reset", time.time()))
+        return max(reset_at - time.time(), 0) + 1
+    return None
+
+
+def _cache_path(query, variables):
+    """Caminho do arquivo de cache para o par (query, variáveis)."""
+    key = hashlib.sha1(
+        query.encode("utf-8") + orjson.dumps(variables, option=orjson.OPT_SORT_KEYS)
+    ).hexdigest()
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+
+def _load_cached(path):
+    """Retorna a resposta em cache se existir e ainda estiver dentro do TTL."""
+    try:
+        if time.time() - os.path.getmtime(path) > CACHE_TTL_SECONDS:
+            return None
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def _save_cached(path, response_data):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(orjson.dumps(response_data))
+    os.replace(tmp_path, path)
+
+
+def _throttle(response):
+    """Espaça as requisições apenas quando o orçamento do rate limit está acabando.
+
+    Distribui as requisições restantes até o reset da janela em vez de usar pausas fixas.
+    """
+    remaining = response.headers.get("X-RateLimit-Remaining")
+    reset_at = response.headers.get("X-RateLimit-Reset")
+    if remaining is None or reset_at is None:
+        return
+    remaining = int(remaining)
+    if remaining >= RATE_LIMIT_LOW_WATERMARK:
+        return
+    wait = max(float(reset_at) - time.time(), 0) / max(remaining, 1)
+    print(f"AVISO: Restam {remaining} pontos de rate limit. Aguardando {wait:.1f}s...")
+    time.sleep(wait)
+
+
+def run_query(query, variables, allow_partial=False):
+    """Função genérica para executar uma query com lógica de retry e cache em disco.
 
+    Com `allow_partial`, uma resposta com `errors` mas com `data` é devolvida (sem ir
+    para o cache): em queries com aliases, só os aliases que falharam vêm nulos.
+    """
+    cache_path = _cache_path(query, variables)
+    cached = _load_cached(cache_path)
+    if cached is not None:
+        return cached
 
-def run_query(query, variables):
-    """Função genérica para executar uma query com lógica de retry."""
     for attempt in range(MAX_RETRIES):
         try:
-            response = requests.post(
+            response = SESSION.post(
                 GITHUB_API_URL,
-                headers=HEADERS,
-                json={"query": query, "variables": variables},
+                data=orjson.dumps({"query": query, "variables": variables}),
                 timeout=45,
             )
             if 500 <= response.status_code < 600:
@@ -94,16 +224,29 @@ def run_query(query, variables):
                 )  # Aumenta o delay a cada tentativa
                 continue
 
+            if response.status_code in (403, 429):
+                wait = _rate_limit_wait(response)
+                if wait is not None:
+                    print(
+                        f"AVISO: Rate limit atingido. Aguardando {wait:.0f}s... (Tentativa {attempt + 1}/{MAX_RETRIES})"
+                    )
+                    time.sleep(wait)
+                    continue
+
             response.raise_for_status()
-            response_data = response.json()
+            response_data = orjson.loads(response.content)
 
             if "errors" in response_data:
                 print(f"ERRO GraphQL: {response_data['errors']}")
-                return None
+                if not allow_partial or not response_data.get("data"):
+                    return None
+            else:
+                _save_cached(cache_path, response_data)
 
+            _throttle(response)
             return response_data
 
-        except requests.RequestException as e:
+        except (requests.RequestException, orjson.JSONDecodeError) as e:
             print(
                 f"ERRO de requisição: {e}. Tentando novamente em {RETRY_DELAY}s... (Tentativa {attempt + 1}/{MAX_RETRIES})"
             )
@@ -113,42 +256,94 @@ def run_query(query, variables):
     return None
 
 
-def fetch_repo_list():
-    """Etapa 1: Busca a lista de 1000 repositórios com dados básicos."""
+def fetch_repo_page(variables):
+    """Busca uma página da lista já com os detalhes de cada repositório.
+
+    Se a query completa falhar, refaz a página com a query leve e completa os
+    detalhes com `fetch_all_repo_details`.
+    """
+    response_data = run_query(SEARCH_REPOS_QUERY, variables)
+    if response_data:
+        return response_data.get("data", {}).get("search", {}), False
+
+    print("AVISO: Página completa rejeitada. Tentando busca leve + detalhes em lote...")
+    response_data = run_query(SEARCH_REPOS_LIGHT_QUERY, variables)
+    if not response_data:
+        return None, False
+    return response_data.get("data", {}).get("search", {}), True
+
+
+def _load_checkpoint():
+    """Lê o checkpoint (cursor e página) de uma execução interrompida, se houver."""
+    try:
+        with open(CHECKPOINT_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_checkpoint(cursor, page_num, total_saved):
+    tmp_path = f"{CHECKPOINT_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"cursor": cursor, "page": page_num, "saved": total_saved}, f)
+    os.replace(tmp_path, CHECKPOINT_FILE)
+
+
+def fetch_and_save_repos(filename):
+    """Etapa 1: Busca os 1000 repositórios com seus detalhes, salvando página a página.
+
+    Cada página é processada e anexada ao CSV assim que chega, e o cursor é salvo
+    em CHECKPOINT_FILE. Se a execução cair no meio, a próxima retoma de onde parou.
+    """
     print("--- ETAPA 1: Buscando a lista de 1000 repositórios ---")
-    all_repos = []
-    cursor = None
-    for page_num in range(1, PAGES_TO_FETCH + 1):
+    checkpoint = _load_checkpoint()
+    if checkpoint and os.path.exists(filename):
+        cursor = checkpoint["cursor"]
+        first_page = checkpoint["page"] + 1
+        total_saved = checkpoint["saved"]
+        print(
+            f"INFO: Retomando a partir da página {first_page} ({total_saved} repositórios já salvos)."
+        )
+    else:
+        cursor = None
+        first_page = 1
+        total_saved = 0
+
+    for page_num in range(first_page, PAGES_TO_FETCH + 1):
         print(f"Buscando página de repositórios {page_num}/{PAGES_TO_FETCH}...")
         variables = {"cursor": cursor, "reposPerPage": REPOS_PER_PAGE}
-        response_data = run_query(SEARCH_REPOS_QUERY, variables)
+        search_results, needs_details = fetch_repo_page(variables)
 
-        if not response_data:
-            return None  # Falha na busca da lista
+        if search_results is None:
+            return total_saved  # Falha na busca; o checkpoint permite retomar
 
-        search_results = response_data.get("data", {}).get("search", {})
         repos = search_results.get("nodes", [])
-        all_repos.extend(repos)
+        if needs_details:
+            repos = fetch_all_repo_details(repos)
+        total_saved += process_and_save_data(repos, filename, append=page_num > 1)
 
         page_info = search_results.get("pageInfo", {})
         cursor = page_info.get("endCursor")
+        _save_checkpoint(cursor, page_num, total_saved)
 
         if not page_info.get("hasNextPage"):
             print(
                 "INFO: API informou que não há mais páginas. Encerrando busca da lista."
             )
             break
-        time.sleep(1)
 
-    print(f"Sucesso! Lista com {len(all_repos)} repositórios coletada.")
-    return all_repos
+    os.remove(CHECKPOINT_FILE)
+    print(f"Sucesso! {total_saved} repositórios coletados e salvos em '{filename}'.")
+    return total_saved
 
 
 def fetch_all_repo_details(repo_list):
-    """Etapa 2: Itera sobre a lista e busca os detalhes de cada repositório."""
-    print("\n--- ETAPA 2: Buscando detalhes para cada repositório ---")
-    detailed_repos = []
-    total_repos = len(repo_list)
+    """Busca os detalhes dos repositórios em lotes de DETAILS_BATCH_SIZE.
+
+    Usado apenas como fallback quando a busca paginada completa falha.
+    """
+    print("Buscando detalhes dos repositórios da página em lotes...")
+    valid_repos = []
     for i, basic_repo_info in enumerate(repo_list):
         if not basic_repo_info:
             continue
@@ -158,90 +353,119 @@ def fetch_all_repo_details(repo_list):
             print(f"AVISO: Repositório inválido ou sem nome na posição {i+1}. Pulando.")
             continue
 
-        owner, name = full_name.split("/")
-        print(f"Buscando detalhes de [{i+1}/{total_repos}]: {full_name}...")
+        valid_repos.append(basic_repo_info)
 
-        variables = {"owner": owner, "name": name}
-        details_data = run_query(GET_REPO_DETAILS_QUERY, variables)
+    total_repos = len(valid_repos)
+    batches = [
+        (start, valid_repos[start : start + DETAILS_BATCH_SIZE])
+        for start in range(0, total_repos, DETAILS_BATCH_SIZE)
+    ]
 
-        if details_data:
-            repo_details = details_data.get("data", {}).get("repository", {})
-            # Combina os dados básicos com os detalhes
-            combined_info = {**basic_repo_info, **repo_details}
-            detailed_repos.append(combined_info)
-        else:
+    def fetch_batch(item):
+        start, batch = item
+        end = start + len(batch)
+        print(f"Buscando detalhes de [{start+1}-{end}/{total_repos}]...")
+
+        query, variables = build_batched_details_query(
+            [repo["nameWithOwner"].split("/", 1) for repo in batch]
+        )
+        # Um repositório removido ou renomeado só anula o seu alias no lote
+        details_data = run_query(query, variables, allow_partial=True)
+
+        if not details_data:
             print(
-                f"AVISO: Falha ao buscar detalhes para {full_name}. Repositório será pulado."
+                f"AVISO: Falha ao buscar detalhes do lote [{start+1}-{end}]. Repositórios serão pulados."
             )
+            return []
 
-        time.sleep(0.5)  # Pausa para não sobrecarregar a API
+        data = details_data.get("data") or {}
+        combined = []
+        for i, basic_repo_info in enumerate(batch):
+            repo_details = data.get(f"r{i}")
+            if repo_details is None:
+                print(
+                    f"AVISO: Falha ao buscar detalhes para {basic_repo_info['nameWithOwner']}. Repositório será pulado."
+                )
+                continue
+            # Combina os dados básicos com os detalhes
+            combined.append({**basic_repo_info, **repo_details})
+        return combined
+
+    # Os lotes são independentes: dispara até MAX_CONCURRENT_REQUESTS em paralelo.
+    # `map` preserva a ordem original (por estrelas) no resultado.
+    detailed_repos = []
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+        for combined in executor.map(fetch_batch, batches):
+            detailed_repos.extend(combined)
 
     return detailed_repos
 
 
-def process_and_save_data(repositories, filename):
-    """Processa os dados combinados e salva em um arquivo CSV."""
+def process_and_save_data(repositories, filename, append=False):
+    """Processa os dados combinados e salva em um arquivo CSV.
+
+    Com `append=True` as linhas são anexadas ao arquivo existente (sem cabeçalho).
+    Retorna o número de repositórios salvos.
+    """
+    repositories = [repo for repo in repositories or [] if repo]
     if not repositories:
         print("Nenhum dado para processar ou salvar.")
-        return
+        return 0
+
+    # Achata os campos aninhados (ex.: "pullRequests.totalCount") em colunas
+    df = pd.json_normalize(repositories).reindex(
+        columns=[
+            "nameWithOwner",
+            "stargazerCount",
+            "primaryLanguage.name",
+            "createdAt",
+            "pushedAt",
+            "pullRequests.totalCount",
+            "releases.totalCount",
+            "closedIssues.totalCount",
+            "totalIssues.totalCount",
+        ]
+    )
+    now = pd.Timestamp.now(tz="UTC")
+    total_issues = df["totalIssues.totalCount"].fillna(0)
+    closed_issues = df["closedIssues.totalCount"].fillna(0)
+
+    # As colunas derivadas são calculadas no próprio DataFrame e o CSV é escrito
+    # direto dele (com `columns`/`header`), sem montar uma segunda cópia dos dados.
+    df["primaryLanguage.name"] = df["primaryLanguage.name"].fillna("N/A")
+    df["idade_dias"] = (
+        (now - pd.to_datetime(df["createdAt"], utc=True, format="ISO8601"))
+        .dt.days.fillna(0)
+        .astype(int)
+    )
+    df["dias_desde_ultimo_push"] = (
+        (now - pd.to_datetime(df["pushedAt"], utc=True, format="ISO8601"))
+        .dt.days.fillna(0)
+        .astype(int)
+    )
+    for coluna in ("pullRequests.totalCount", "releases.totalCount"):
+        df[coluna] = df[coluna].fillna(0).astype(int)
+    df["razao_issues_fechadas"] = (
+        closed_issues / total_issues.where(total_issues > 0)
+    ).fillna(0)
 
-    print(f"\n--- ETAPA 3: Processando dados e salvando em '{filename}' ---")
-    processed_list = []
-    now = datetime.now(timezone.utc)
-    for repo in repositories:
-        if not repo:
-            continue
-        total_issues = repo.get("totalIssues", {}).get("totalCount", 0)
-        closed_issues = repo.get("closedIssues", {}).get("totalCount", 0)
-        created_at_str = repo.get("createdAt")
-        age_days = (
-            (now - datetime.fromisoformat(created_at_str.replace("Z", "+00:00"))).days
-            if created_at_str
-            else 0
-        )
-        pushed_at_str = repo.get("pushedAt")
-        last_update_days = (
-            (now - datetime.fromisoformat(pushed_at_str.replace("Z", "+00:00"))).days
-            if pushed_at_str
-            else 0
-        )
-        closed_issues_ratio = closed_issues / total_issues if total_issues > 0 else 0
-        processed_repo = {
-            "nome_repositorio": repo.get("nameWithOwner"),
-            "estrelas": repo.get("stargazerCount"),
-            "linguagem_primaria": (
-                repo.get("primaryLanguage", {}).get("name")
-                if repo.get("primaryLanguage")
-                else "N/A"
-            ),
-            "idade_dias": age_days,
-            "dias_desde_ultimo_push": last_update_days,
-            "total_pull_requests_aceitas": repo.get("pullRequests", {}).get(
-                "totalCount", 0
-            ),
-            "total_releases": repo.get("releases", {}).get("totalCount", 0),
-            "razao_issues_fechadas": closed_issues_ratio,
-        }
-        processed_list.append(processed_repo)
     try:
-        with open(filename, "w", newline="", encoding="utf-8") as csvfile:
-            headers = processed_list[0].keys()
-            writer = csv.DictWriter(csvfile, fieldnames=headers)
-            writer.writeheader()
-            writer.writerows(processed_list)
-        print(f"Arquivo '{filename}' salvo com sucesso!")
-    except (IOError, IndexError) as e:
+        with open(filename, "a" if append else "w", newline="", encoding="utf-8") as f:
+            df.to_csv(
+                f,
+                columns=list(CSV_COLUMNS),
+                header=False if append else list(CSV_COLUMNS.values()),
+                index=False,
+            )
+            f.flush()
+            os.fsync(f.fileno())
+    except IOError as e:
         print(f"Erro ao salvar o arquivo CSV: {e}")
+        return 0
+    return len(df)
 
 
 # --- Bloco de Execução Principal ---
 if __name__ == "__main__":
-    # Etapa 1
-    basic_repo_list = fetch_repo_list()
-
-    if basic_repo_list:
-        # Etapa 2
-        full_repo_data = fetch_all_repo_details(basic_repo_list)
-        # Etapa 3
-        if full_repo_data:
-            process_and_save_data(full_repo_data, OUTPUT_CSV_FILE)
+    # A lista já vem com os detalhes de cada repositório e é salva página a página
+    fetch_and_save_repos(OUTPUT_CSV_FILE)
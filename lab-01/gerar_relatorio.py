@@ -1,17 +1,27 @@
 # gerar_relatorio.py
 import pandas as pd
+import matplotlib
+
+matplotlib.use("Agg")  # Sem backend gráfico: os plots são gerados em subprocessos
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 import base64
+import hashlib
+import inspect
+import json
 from io import BytesIO
 import webbrowser
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 # --- CONFIGURAÇÕES ---
 ARQUIVO_CSV = "repositorios_graphql_completo.csv"
 ARQUIVO_HTML = "relatorio_completo.html"
 ARQUIVO_PDF = "relatorio_completo.pdf"
+DIRETORIO_CACHE = ".cache_graficos"
+# Versão do formato do cache das RQs: incrementar invalida todas as entradas salvas
+VERSAO_CACHE = 1
 NOMES_ALUNOS = "Pedro Reis e Gabriel Fernandes"
 TITULO_RELATORIO = "Relatório de Análise de Repositórios Populares do GitHub"
 
@@ -69,7 +79,34 @@ METODOLOGIA_TEXTO = """
 # --- FUNÇÕES DE ANÁLISE E PLOTAGEM ---
 
 
-def analisar_rq01(df):
+NOME_FIGURA = "relatorio"
+
+
+def obter_figura(figsize):
+    """Retorna a Figure do processo, limpa e redimensionada para o próximo gráfico.
+
+    Evita criar e destruir uma Figure nova (e seu canvas) a cada RQ.
+    """
+    fig = plt.figure(num=NOME_FIGURA, clear=True)
+    fig.set_size_inches(figsize)
+    return fig
+
+
+def calcular_agregados(df):
+    """Calcula uma única vez os agregados compartilhados entre as RQs."""
+    return {
+        "contagem_linguagens": df["linguagem_primaria"].value_counts(),
+        "medianas_por_linguagem": df.groupby("linguagem_primaria").agg(
+            {
+                "total_pull_requests_aceitas": "median",
+                "total_releases": "median",
+                "dias_desde_ultimo_push": "median",
+            }
+        ),
+    }
+
+
+def analisar_rq01(df, agregados):
     """Analisa a idade dos repositórios (RQ01)."""
     print("Analisando RQ01: Idade dos repositórios...")
     mediana_idade = df["idade_dias"].median()
@@ -80,7 +117,7 @@ def analisar_rq01(df):
     <p><b>Discussão:</b> O valor mediano de quase {mediana_anos:.1f} anos confirma a hipótese de que a maioria dos repositórios populares não é recente, possuindo um tempo considerável de existência e desenvolvimento.</p>
     """
 
-    plt.figure(figsize=(10, 6))
+    obter_figura((10, 6))
     sns.histplot(df["idade_dias"], bins=50, kde=True)
     plt.title("RQ01: Distribuição da Idade dos Repositórios (em dias)", fontsize=16)
     plt.xlabel("Idade (dias)", fontsize=12)
@@ -98,7 +135,7 @@ def analisar_rq01(df):
     return texto, plot_to_base64()
 
 
-def analisar_rq02(df):
+def analisar_rq02(df, agregados):
     """Analisa o total de pull requests (RQ02)."""
     print("Analisando RQ02: Contribuição externa (Pull Requests)...")
     mediana_prs = df["total_pull_requests_aceitas"].median()
@@ -108,7 +145,7 @@ def analisar_rq02(df):
     <p><b>Discussão:</b> Este valor mediano indica um volume significativo e constante de contribuições da comunidade. O gráfico de distribuição (boxplot) mostra que, embora a mediana seja alta, existem repositórios (outliers) que recebem um volume de contribuições ordens de magnitude maior, como frameworks e bibliotecas de uso massivo.</p>
     """
 
-    plt.figure(figsize=(10, 6))
+    obter_figura((10, 6))
     sns.boxplot(x=df["total_pull_requests_aceitas"])
     plt.title("RQ02: Distribuição do Total de Pull Requests Aceitas", fontsize=16)
     plt.xlabel("Total de Pull Requests (escala log)", fontsize=12)
@@ -118,7 +155,7 @@ def analisar_rq02(df):
     return texto, plot_to_base64()
 
 
-def analisar_rq03(df):
+def analisar_rq03(df, agregados):
     """Analisa o total de releases (RQ03)."""
     print("Analisando RQ03: Frequência de releases...")
     mediana_releases = df["total_releases"].median()
@@ -128,7 +165,7 @@ def analisar_rq03(df):
     <p><b>Discussão:</b> A mediana sugere que a prática de versionamento formal via releases é bem estabelecida entre os projetos populares. Uma mediana de {mediana_releases:.0f} releases ao longo da vida do projeto indica um ciclo de desenvolvimento maduro e organizado.</p>
     """
 
-    plt.figure(figsize=(10, 6))
+    obter_figura((10, 6))
     sns.boxplot(x=df["total_releases"])
     plt.title("RQ03: Distribuição do Total de Releases", fontsize=16)
     plt.xlabel("Total de Releases (escala log)", fontsize=12)
@@ -138,7 +175,7 @@ def analisar_rq03(df):
     return texto, plot_to_base64()
 
 
-def analisar_rq04(df):
+def analisar_rq04(df, agregados):
     """Analisa a frequência de atualização (RQ04)."""
     print("Analisando RQ04: Frequência de atualização...")
     mediana_atualizacao = df["dias_desde_ultimo_push"].median()
@@ -148,9 +185,10 @@ def analisar_rq04(df):
     <p><b>Discussão:</b> Uma mediana de {mediana_atualizacao:.0f} dias confirma que são projetos extremamente ativos, com metade dos repositórios tendo recebido código novo neste curto período.</p>
     """
 
-    dados_filtrados = df[df["dias_desde_ultimo_push"] < 365]
-    plt.figure(figsize=(10, 6))
-    sns.histplot(dados_filtrados["dias_desde_ultimo_push"], bins=50, kde=True)
+    # Filtra só a coluna usada no gráfico, sem copiar o DataFrame inteiro
+    dias_push = df["dias_desde_ultimo_push"]
+    obter_figura((10, 6))
+    sns.histplot(dias_push[dias_push < 365], bins=50, kde=True)
     plt.title(
         "RQ04: Distribuição de Dias Desde a Última Atualização (no último ano)",
         fontsize=16,
@@ -170,10 +208,10 @@ def analisar_rq04(df):
     return texto, plot_to_base64()
 
 
-def analisar_rq05(df):
+def analisar_rq05(df, agregados):
     """Analisa as linguagens primárias (RQ05)."""
     print("Analisando RQ05: Linguagens primárias...")
-    contagem_linguagens = df["linguagem_primaria"].value_counts().nlargest(15)
+    contagem_linguagens = agregados["contagem_linguagens"].nlargest(15)
     tabela_html = contagem_linguagens.to_frame().to_html(
         classes="table table-striped text-center"
     )
@@ -185,7 +223,7 @@ def analisar_rq05(df):
     <h4>Contagem de Repositórios por Linguagem (Top 15)</h4>{tabela_html}</div></div>
     """
 
-    plt.figure(figsize=(12, 8))
+    obter_figura((12, 8))
     sns.barplot(
         x=contagem_linguagens.values,
         y=contagem_linguagens.index,
@@ -200,7 +238,7 @@ def analisar_rq05(df):
     return texto, plot_to_base64()
 
 
-def analisar_rq06(df):
+def analisar_rq06(df, agregados):
     """Analisa a razão de issues fechadas (RQ06)."""
     print("Analisando RQ06: Razão de issues fechadas...")
     mediana_razao_issues = df["razao_issues_fechadas"].median()
@@ -210,7 +248,7 @@ def analisar_rq06(df):
     <p><b>Discussão:</b> Uma mediana de {mediana_razao_issues*100:.0f}% é um indicador muito forte de saúde e boa manutenção do projeto. Mostra que a maioria dos projetos populares consegue gerenciar e resolver a grande maioria dos problemas e sugestões que recebem da comunidade.</p>
     """
 
-    plt.figure(figsize=(10, 6))
+    obter_figura((10, 6))
     sns.histplot(df["razao_issues_fechadas"], bins=40, kde=True)
     plt.title("RQ06: Distribuição da Razão de Issues Fechadas", fontsize=16)
     plt.xlabel("Razão (Issues Fechadas / Total de Issues)", fontsize=12)
@@ -228,22 +266,14 @@ def analisar_rq06(df):
     return texto, plot_to_base64()
 
 
-def analisar_rq07(df):
+def analisar_rq07(df, agregados):
     """Analisa métricas por linguagem (RQ07 - Bônus)."""
     print("Analisando RQ07 (Bônus): Métricas por linguagem...")
 
-    top_10_languages = df["linguagem_primaria"].value_counts().nlargest(10).index
-    df_top_lang = df[df["linguagem_primaria"].isin(top_10_languages)]
-
+    top_10_languages = agregados["contagem_linguagens"].nlargest(10).index
     grouped_stats = (
-        df_top_lang.groupby("linguagem_primaria")
-        .agg(
-            {
-                "total_pull_requests_aceitas": "median",
-                "total_releases": "median",
-                "dias_desde_ultimo_push": "median",
-            }
-        )
+        agregados["medianas_por_linguagem"]
+        .loc[top_10_languages]
         .sort_values(by="total_pull_requests_aceitas", ascending=False)
     )
 
@@ -252,7 +282,7 @@ def analisar_rq07(df):
     <p><b>Discussão:</b> A análise revela nuances interessantes. Por exemplo, linguagens como Rust e Go, apesar de modernas, mostram um alto volume mediano de contribuições, refletindo comunidades vibrantes. A frequência de atualização (menor número de dias desde o último push) é consistentemente baixa em todas as linguagens populares, confirmando que todos são projetos ativos. As diferenças na mediana de releases podem indicar culturas de desenvolvimento distintas entre as comunidades de cada linguagem.</p>
     """
 
-    fig, ax = plt.subplots(3, 1, figsize=(12, 18), sharex=True)
+    ax = obter_figura((12, 18)).subplots(3, 1, sharex=True)
 
     sns.barplot(
         x=grouped_stats.index,
@@ -291,19 +321,85 @@ def analisar_rq07(df):
     return texto, plot_to_base64()
 
 
+QUALIDADE_WEBP = 80
+
+
 def plot_to_base64():
-    """Converte um plot do matplotlib para uma string base64 para embutir no HTML."""
+    """Converte um plot do matplotlib para uma string base64 para embutir no HTML.
+
+    Usa WebP com perda leve, que fica bem menor que PNG no HTML final.
+    """
     buf = BytesIO()
-    plt.savefig(buf, format="png", bbox_inches="tight")
+    plt.savefig(
+        buf, format="webp", bbox_inches="tight", pil_kwargs={"quality": QUALIDADE_WEBP}
+    )
     buf.seek(0)
     img_base64 = base64.b64encode(buf.read()).decode("utf-8")
-    plt.close()
-    return f"data:image/png;base64,{img_base64}"
+    plt.clf()  # Mantém a Figure aberta para ser reaproveitada pela próxima RQ
+    return f"data:image/webp;base64,{img_base64}"
+
+
+def chave_cache(dados_csv, funcao_analise):
+    """Chave do cache de uma RQ: muda se o CSV, o código que gera a RQ ou a
+    configuração que define a imagem (qualidade WebP, rcParams/DPI, versões das
+    bibliotecas de plotagem) mudar."""
+    fontes = "".join(
+        inspect.getsource(f)
+        for f in (funcao_analise, plot_to_base64, calcular_agregados, obter_figura)
+    )
+    configuracao = json.dumps(
+        {
+            "versao_cache": VERSAO_CACHE,
+            "qualidade_webp": QUALIDADE_WEBP,
+            "matplotlib": matplotlib.__version__,
+            "seaborn": sns.__version__,
+            "rcparams": {chave: repr(valor) for chave, valor in plt.rcParams.items()},
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha1(
+        dados_csv + fontes.encode("utf-8") + configuracao.encode("utf-8")
+    ).hexdigest()
+
+
+def ler_cache(chave):
+    """Retorna (texto, grafico) salvos para a chave, ou None se não houver cache."""
+    try:
+        with open(
+            os.path.join(DIRETORIO_CACHE, f"{chave}.json"), encoding="utf-8"
+        ) as f:
+            return tuple(json.load(f))
+    except (OSError, ValueError):
+        return None
+
+
+def salvar_cache(chave, resultado):
+    os.makedirs(DIRETORIO_CACHE, exist_ok=True)
+    with open(
+        os.path.join(DIRETORIO_CACHE, f"{chave}.json"), "w", encoding="utf-8"
+    ) as f:
+        json.dump(resultado, f)
+
+
+def limpar_cache(chaves_atuais):
+    """Remove do cache as entradas que não pertencem à execução atual."""
+    arquivos_atuais = {f"{chave}.json" for chave in chaves_atuais}
+    try:
+        with os.scandir(DIRETORIO_CACHE) as entradas:
+            for entrada in entradas:
+                if entrada.is_file() and entrada.name not in arquivos_atuais:
+                    os.remove(entrada.path)
+    except OSError:
+        pass
 
 
 def gerar_html(conteudo):
-    """Gera o arquivo HTML final a partir de uma lista de seções."""
-    html_template = f"""
+    """Gera o arquivo HTML final a partir de uma lista de seções.
+
+    O cabeçalho, cada seção e o rodapé são escritos direto no arquivo, sem montar
+    antes uma única string com todo o relatório (e suas imagens base64) em memória.
+    """
+    cabecalho = f"""
     <!DOCTYPE html><html lang="pt-br"><head>
         <meta charset="UTF-8"><meta name="viewport" content="width=device-width, initial-scale=1.0">
         <title>{TITULO_RELATORIO}</title>
@@ -332,19 +428,34 @@ def gerar_html(conteudo):
             <p>A seguir, apresentamos os resultados detalhados para cada questão de pesquisa.</p>
         </div>
 
-        {"".join(conteudo)}
-        
+    """
+    rodape = """
     </div></body></html>
     """
     with open(ARQUIVO_HTML, "w", encoding="utf-8") as f:
-        f.write(html_template)
+        f.write(cabecalho)
+        for secao in conteudo:
+            f.write(secao)
+        f.write(rodape)
     print(f"\\nRelatório '{ARQUIVO_HTML}' gerado com sucesso!")
 
 
 # --- BLOCO DE EXECUÇÃO PRINCIPAL ---
 if __name__ == "__main__":
     try:
-        df = pd.read_csv(ARQUIVO_CSV)
+        # Leitura com o parser do PyArrow e colunas Arrow (strings bem mais compactas)
+        df = pd.read_csv(
+            ARQUIVO_CSV,
+            engine="pyarrow",
+            dtype_backend="pyarrow",
+            dtype={
+                "estrelas": "int32[pyarrow]",
+                "idade_dias": "int32[pyarrow]",
+                "dias_desde_ultimo_push": "int32[pyarrow]",
+                "total_pull_requests_aceitas": "int32[pyarrow]",
+                "total_releases": "int32[pyarrow]",
+            },
+        )
     except FileNotFoundError:
         print(f"ERRO: O arquivo '{ARQUIVO_CSV}' não foi encontrado.")
         print("Execute o script 'coleta_graphql.py' primeiro para gerar os dados.")
@@ -372,11 +483,31 @@ if __name__ == "__main__":
         ),
     ]
 
+    # Reaproveita as RQs já geradas para este mesmo CSV e código
+    with open(ARQUIVO_CSV, "rb") as f:
+        dados_csv = f.read()
+    chaves = [chave_cache(dados_csv, funcao) for _, _, funcao in sessoes_rq]
+    resultados = [ler_cache(chave) for chave in chaves]
+    pendentes = [i for i, resultado in enumerate(resultados) if resultado is None]
+
+    if pendentes:
+        agregados = calcular_agregados(df)
+
+        # As RQs são independentes entre si: cada uma é analisada e plotada em um processo
+        with ProcessPoolExecutor() as executor:
+            futuros = {
+                i: executor.submit(sessoes_rq[i][2], df, agregados) for i in pendentes
+            }
+            for i, futuro in futuros.items():
+                resultados[i] = futuro.result()
+                salvar_cache(chaves[i], resultados[i])
+
+    limpar_cache(chaves)
+
     html_content = []
-    for rq_num, titulo, funcao_analise in sessoes_rq:
+    for (rq_num, titulo, _), (texto, grafico_b64) in zip(sessoes_rq, resultados):
         section_html = f'<div class="rq-section"><h3>RQ{rq_num}: {titulo}</h3>'
 
-        texto, grafico_b64 = funcao_analise(df)
         section_html += texto
         if grafico_b64:
             section_html += f'<div class="grafico"><img src="{grafico_b64}" class="img-fluid" alt="Gráfico para RQ{rq_num}"></div>'
@@ -1,13 +1,15 @@
+import numpy as np
 import pandas as pd
-import seaborn as sns
 import matplotlib.pyplot as plt
 import base64
 from io import BytesIO
-from scipy.stats import pearsonr, spearmanr
+from scipy.stats import rankdata
 
 # --- 1. CONFIGURAÇÕES ---
 INPUT_CSV_FILE = "C:\\Users\\Pedro\\Desktop\\Lab\\repo-miner-puc\\lab-02\\result\\all_java_projects_class_metrics.csv"
 OUTPUT_HTML_FILE = "relatorio_lab02s02.html"
+# Máximo de células por eixo na grade de densidade desenhada no gráfico
+SCATTER_GRID_MAX_BINS = 200
 
 # --- 2. FUNÇÕES DE ANÁLISE ---
 
@@ -15,16 +17,16 @@ OUTPUT_HTML_FILE = "relatorio_lab02s02.html"
 def load_data(filepath):
     """Carrega os dados do CSV, conta repositórios únicos e retorna ambos."""
     try:
-        df = pd.read_csv(filepath)
+        # Carrega só as colunas usadas na análise; `usecols` já falha se alguma
+        # delas não existir no arquivo.
+        df = pd.read_csv(
+            filepath,
+            usecols=["cbo", "loc", "repository"],
+            dtype={"cbo": "int32", "loc": "int32", "repository": "category"},
+            engine="pyarrow",
+        )
         print(f"Dados carregados com sucesso de '{filepath}'.")
 
-        # Validação das colunas
-        required_cols = ["cbo", "loc", "repository"]
-        if not all(col in df.columns for col in required_cols):
-            raise ValueError(
-                f"O arquivo CSV deve conter as colunas: {', '.join(required_cols)}."
-            )
-
         # Conta o número de repositórios únicos
         repo_count = df["repository"].nunique()
         print(f"Número de repositórios únicos encontrados: {repo_count}")
@@ -53,9 +55,13 @@ def calculate_statistics(df):
 
 def perform_correlation_analysis(df):
     """Calcula a correlação de Pearson e Spearman entre LOC e CBO."""
-    df_cleaned = df[["loc", "cbo"]].dropna()
-    pearson_corr, _ = pearsonr(df_cleaned["loc"], df_cleaned["cbo"])
-    spearman_corr, _ = spearmanr(df_cleaned["loc"], df_cleaned["cbo"])
+    # Um único array float32 com as duas colunas; os p-valores não são usados,
+    # então os coeficientes são calculados direto com NumPy.
+    valores = df[["loc", "cbo"]].dropna().to_numpy(dtype=np.float32)
+    loc, cbo = valores[:, 0], valores[:, 1]
+    pearson_corr = np.corrcoef(loc, cbo)[0, 1]
+    # Spearman = Pearson sobre os postos (ranks) de cada coluna
+    spearman_corr = np.corrcoef(rankdata(loc), rankdata(cbo))[0, 1]
 
     print("\n--- Análise de Correlação ---")
     print(f"Correlação de Pearson (LOC vs CBO): {pearson_corr:.4f}")
@@ -64,29 +70,66 @@ def perform_correlation_analysis(df):
     return pearson_corr, spearman_corr
 
 
+def bordas_grade_inteira(limite):
+    """Bordas de uma grade para valores inteiros de 0 a `limite`.
+
+    Cada célula cobre o mesmo número inteiro de valores: um por célula enquanto
+    couberem em SCATTER_GRID_MAX_BINS, e a menor largura inteira que caiba acima disso.
+    """
+    limite = int(limite)
+    largura = -(-(limite + 1) // SCATTER_GRID_MAX_BINS)
+    return np.arange(-0.5, limite + largura, largura)
+
+
 def create_visualization(df):
     """Cria e salva um gráfico de dispersão para LOC vs CBO."""
     print("\n--- Gerando Visualização ---")
-    plt.figure(figsize=(10, 6))
-    sns.regplot(
-        x="loc",
-        y="cbo",
-        data=df,
-        scatter_kws={"alpha": 0.2, "s": 10},
-        line_kws={"color": "red", "linewidth": 2},
+    df_cleaned = df[["loc", "cbo"]].dropna()
+    xmax = df_cleaned["loc"].quantile(0.95)
+    ymax = df_cleaned["cbo"].quantile(0.95)
+
+    # A reta de regressão é ajustada com todas as classes; os pontos da área
+    # visível são agregados em uma grade de densidade (escala log), de modo que o
+    # custo do desenho depende do tamanho da grade e não do número de classes.
+    slope, intercept = np.polyfit(df_cleaned["loc"], df_cleaned["cbo"], 1)
+    # LOC e CBO são inteiros: bordas alinhadas aos inteiros evitam faixas vazias
+    # ou com o dobro de valores na grade.
+    densidade, x_bordas, y_bordas = np.histogram2d(
+        df_cleaned["loc"],
+        df_cleaned["cbo"],
+        bins=[bordas_grade_inteira(xmax), bordas_grade_inteira(ymax)],
+    )
+
+    plt.figure(figsize=(8, 5))
+    plt.pcolormesh(
+        x_bordas,
+        y_bordas,
+        np.log1p(densidade).T,
+        cmap="Blues",
+        shading="auto",
+        rasterized=True,
     )
+    plt.colorbar(label="log(1 + nº de classes)")
+    xs = np.array([0, xmax])
+    plt.plot(xs, slope * xs + intercept, color="red", linewidth=2)
 
     plt.title("Relação entre Tamanho da Classe (LOC) e Acoplamento (CBO)", fontsize=16)
     plt.xlabel("Linhas de Código (LOC)", fontsize=12)
     plt.ylabel("Acoplamento Entre Objetos (CBO)", fontsize=12)
 
-    plt.xlim(0, df["loc"].quantile(0.95))
-    plt.ylim(0, df["cbo"].quantile(0.95))
+    plt.xlim(0, xmax)
+    plt.ylim(0, ymax)
 
     plt.grid(True, which="both", linestyle="--", linewidth=0.5)
 
     img_buffer = BytesIO()
-    plt.savefig(img_buffer, format="png", bbox_inches="tight")
+    plt.savefig(
+        img_buffer,
+        format="webp",
+        dpi=72,
+        bbox_inches="tight",
+        pil_kwargs={"quality": 80},
+    )
     plt.close()
 
     img_base64 = base64.b64encode(img_buffer.getvalue()).decode("utf-8")
@@ -97,24 +140,9 @@ def create_visualization(df):
 
 # --- 3. GERAÇÃO DO RELATÓRIO HTML ---
 
-
-def generate_html_report(stats_df, pearson_corr, spearman_corr, img_base64, repo_count):
-    """Gera um relatório HTML completo com os resultados da análise."""
-
-    def format_br(value):
-        return f"{value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-
-    stats_df_formatted = stats_df.applymap(format_br)
-    stats_html = stats_df_formatted.to_html(
-        classes="table table-striped table-bordered text-center", justify="center"
-    )
-
-    pearson_br = f"{pearson_corr:.4f}".replace(".", ",")
-    spearman_br = f"{spearman_corr:.4f}".replace(".", ",")
-
-    conclusion_text = ""
-    if spearman_corr > 0.3:
-        conclusion_text = f"""
+# Templates fixos do relatório: apenas os trechos dinâmicos são preenchidos
+# em generate_html_report (via str.format/format_map).
+STRONG_CONCLUSION_TEMPLATE = """
         <p>A análise dos dados suporta fortemente as hipóteses iniciais.</p>
         <ol>
             <li><b>H1 (Classes maiores são mais propensas a ter maior acoplamento):</b> O gráfico de dispersão mostra uma clara tendência positiva. À medida que o valor de LOC (eixo X) aumenta, os valores de CBO (eixo Y) também tendem a aumentar.</li>
@@ -122,8 +150,8 @@ def generate_html_report(stats_df, pearson_corr, spearman_corr, img_base64, repo
         </ol>
         <p>Portanto, podemos concluir que, no contexto dos projetos analisados, o tamanho de uma classe é um fator que influencia seu nível de acoplamento.</p>
         """
-    else:
-        conclusion_text = f"""
+
+WEAK_CONCLUSION_TEMPLATE = """
         <p>A análise dos dados fornece insights sobre as hipóteses iniciais.</p>
          <ol>
             <li><b>H1 (Classes maiores são mais propensas a ter maior acoplamento):</b> O gráfico de dispersão mostra uma leve tendência positiva.</li>
@@ -132,8 +160,7 @@ def generate_html_report(stats_df, pearson_corr, spearman_corr, img_base64, repo
         <p>Concluímos que há uma relação estatística, mas fraca, entre o tamanho e o acoplamento das classes nos projetos analisados.</p>
         """
 
-    # <-- ALTERAÇÃO: Nova seção de introdução
-    intro_section = f"""
+INTRO_SECTION_TEMPLATE = """
     <section id="intro">
         <h2>1. Introdução</h2>
         <p>Este relatório apresenta uma análise da relação entre duas importantes métricas de qualidade de software: <b>Tamanho da Classe</b> (medido por Linhas de Código, ou LOC) e <b>Acoplamento Entre Objetos</b> (CBO). O objetivo é investigar se classes maiores tendem a ser mais acopladas a outras classes no sistema.</p>
@@ -148,8 +175,8 @@ def generate_html_report(stats_df, pearson_corr, spearman_corr, img_base64, repo
     </section>
     """
 
-    # Template HTML com a nova seção e renumeração
-    html_content = f"""
+# Template HTML com a seção de introdução e renumeração
+HTML_TEMPLATE = """
     <!DOCTYPE html>
     <html lang="pt-BR">
     <head>
@@ -193,7 +220,7 @@ def generate_html_report(stats_df, pearson_corr, spearman_corr, img_base64, repo
             <section id="visualization">
                 <h2>4. Visualização Gráfica</h2>
                 <p>O gráfico de dispersão abaixo ilustra a relação entre LOC e CBO.</p>
-                <img src="data:image/png;base64,{img_base64}" alt="Gráfico de Dispersão LOC vs CBO">
+                <img src="data:image/webp;base64,{img_base64}" alt="Gráfico de Dispersão LOC vs CBO">
             </section>
             
             <section id="conclusion">
@@ -206,6 +233,46 @@ def generate_html_report(stats_df, pearson_corr, spearman_corr, img_base64, repo
     </html>
     """
 
+
+# Troca "," por "." e vice-versa em uma única passada (str.translate)
+SEPARADORES_BR = str.maketrans(",.", ".,")
+
+
+def format_br(value):
+    """Formata um número no padrão brasileiro (ex.: 1.234,56)."""
+    return f"{value:,.2f}".translate(SEPARADORES_BR)
+
+
+def generate_html_report(stats_df, pearson_corr, spearman_corr, img_base64, repo_count):
+    """Gera um relatório HTML completo com os resultados da análise."""
+
+    # Formata direto na renderização da tabela, sem criar um DataFrame
+    # intermediário de strings célula a célula (applymap).
+    stats_html = stats_df.to_html(
+        classes="table table-striped table-bordered text-center",
+        justify="center",
+        float_format=format_br,
+    )
+
+    pearson_br = f"{pearson_corr:.4f}".translate(SEPARADORES_BR)
+    spearman_br = f"{spearman_corr:.4f}".translate(SEPARADORES_BR)
+
+    if spearman_corr > 0.3:
+        conclusion_template = STRONG_CONCLUSION_TEMPLATE
+    else:
+        conclusion_template = WEAK_CONCLUSION_TEMPLATE
+
+    html_content = HTML_TEMPLATE.format_map(
+        {
+            "intro_section": INTRO_SECTION_TEMPLATE.format(repo_count=repo_count),
+            "stats_html": stats_html,
+            "pearson_br": pearson_br,
+            "spearman_br": spearman_br,
+            "img_base64": img_base64,
+            "conclusion_text": conclusion_template.format(spearman_br=spearman_br),
+        }
+    )
+
     try:
         with open(OUTPUT_HTML_FILE, "w", encoding="utf-8") as f:
             f.write(html_content)
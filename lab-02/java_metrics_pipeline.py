@@ -1,16 +1,22 @@
 # java_metrics_pipeline_final.py
 import os
+import json
+import orjson
 import requests
 import csv
 import time
 import shutil
 import subprocess
+import tempfile
 import sys
-import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 import stat
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from dotenv import load_dotenv
-from git import Repo
 
 # --- 1. CONFIGURAÇÕES E CONSTANTES ---
 
@@ -30,11 +36,67 @@ REPOS_PER_PAGE = 100  # Agora esta constante será usada corretamente
 PAGES_TO_FETCH = 10
 MAX_RETRIES = 3
 RETRY_DELAY = 5
+# Abaixo deste número de pontos restantes, espera o reset do rate limit
+RATE_LIMIT_MIN_REMAINING = 50
+
+# Faixas de estrelas disjuntas (da mais popular para a menos) buscadas em paralelo.
+# Juntas devem cobrir os TOP_REPOS_COUNT primeiros; cada busca retorna no máximo
+# 1000 resultados, então só a última faixa pode ser truncada.
+TOP_REPOS_COUNT = REPOS_PER_PAGE * PAGES_TO_FETCH
+STAR_RANGES = [
+    ">=50000",
+    "20000..49999",
+    "10000..19999",
+    "7000..9999",
+    "5000..6999",
+    "3000..4999",
+]
+SEARCH_RESULTS_LIMIT = 1000
+MAX_SEARCH_WORKERS = 5
+
+# Sessão reutilizada em todas as queries: mantém a conexão TLS aberta (keep-alive)
+# em vez de abrir uma nova conexão por requisição.
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount(
+    "https://",
+    requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=MAX_SEARCH_WORKERS),
+)
+
+# Cache em disco da lista de repositórios (evita refazer a busca a cada execução)
+REPO_LIST_CACHE_FILE = "top_java_repos.json"
+REPO_LIST_CACHE_TTL = 24 * 60 * 60
 
 REPOS_BASE_DIR = "cloned_repos"
 CK_JAR_PATH = os.path.join("CK", "ck-0.7.0.jar")
 FINAL_CSV_FILE = "all_java_projects_class_metrics.csv"
 RESULT_BASE_PATH = "result"
+# Métricas do CK já calculadas, uma por repositório e commit (HEAD remoto)
+CK_CACHE_DIR = "ck_cache"
+
+# Colunas do class.csv do CK usadas na análise (analyze_report.py)
+CK_COLUMNS = ["class", "cbo", "loc"]
+CK_CONVERT_OPTIONS = pa_csv.ConvertOptions(
+    include_columns=CK_COLUMNS,
+    column_types={"cbo": pa.int32(), "loc": pa.int32()},
+)
+
+# Repositórios analisados em paralelo e limite de heap de cada JVM do CK
+MAX_WORKERS = min(8, os.cpu_count() or 1)
+# Repositórios submetidos e ainda não consumidos (em execução ou já prontos à espera
+# dos anteriores na ordem da lista)
+MAX_PENDING_REPOS = 2 * MAX_WORKERS
+CK_MAX_HEAP = "-Xmx512m"
+
+# Arquivo CDS (Class Data Sharing) com as classes do CK já carregadas: é criado na
+# primeira execução e reaproveitado nas seguintes, reduzindo o startup de cada JVM.
+# Opções não suportadas pela versão do Java instalada são ignoradas.
+CK_CDS_ARCHIVE = os.path.join("CK", "ck.jsa")
+CK_JVM_FLAGS = [
+    "-XX:+IgnoreUnrecognizedVMOptions",
+    "-XX:+AutoCreateSharedArchive",
+    f"-XX:SharedArchiveFile={CK_CDS_ARCHIVE}",
+]
 
 
 def remove_readonly(func, path, _):
@@ -47,10 +109,11 @@ def remove_readonly(func, path, _):
 
 # --- ALTERAÇÃO: A query agora aceita a variável $perPage ---
 SEARCH_JAVA_REPOS_QUERY = """
-query SearchPopularJavaRepos($cursor: String, $perPage: Int!) {
-  search(query: "language:Java sort:stars-desc", type: REPOSITORY, first: $perPage, after: $cursor) {
+query SearchPopularJavaRepos($searchQuery: String!, $cursor: String, $perPage: Int!) {
+  rateLimit { remaining, resetAt }
+  search(query: $searchQuery, type: REPOSITORY, first: $perPage, after: $cursor) {
     pageInfo { endCursor, hasNextPage }
-    nodes { ... on Repository { nameWithOwner } }
+    nodes { ... on Repository { nameWithOwner, stargazerCount } }
   }
 }
 """
@@ -60,19 +123,18 @@ def run_graphql_query(query, variables):
     """Função genérica para executar uma query GraphQL com lógica de retry."""
     for attempt in range(MAX_RETRIES):
         try:
-            response = requests.post(
+            response = SESSION.post(
                 GITHUB_API_URL,
-                headers=HEADERS,
-                json={"query": query, "variables": variables},
+                data=orjson.dumps({"query": query, "variables": variables}),
                 timeout=45,
             )
             response.raise_for_status()
-            response_data = response.json()
+            response_data = orjson.loads(response.content)
             if "errors" in response_data:
                 print(f"ERRO GraphQL: {response_data['errors']}")
                 return None
             return response_data
-        except requests.RequestException as e:
+        except (requests.RequestException, orjson.JSONDecodeError) as e:
             print(
                 f"ERRO de requisição: {e}. Tentando novamente... (Tentativa {attempt + 1}/{MAX_RETRIES})"
             )
@@ -81,31 +143,94 @@ def run_graphql_query(query, variables):
     return None
 
 
-def fetch_top_java_repos():
-    """Busca a lista dos 1000 repositórios Java mais populares."""
-    print("--- ETAPA 1: Buscando a lista de repositórios Java no GitHub ---")
-    all_repos = []
-    cursor = None
-    for page_num in range(1, PAGES_TO_FETCH + 1):
-        print(f"Buscando página de repositórios {page_num}/{PAGES_TO_FETCH}...")
+def wait_for_rate_limit(rate_limit):
+    """Aguarda o reset da janela de rate limit se os pontos restantes estiverem no fim."""
+    if not rate_limit or rate_limit["remaining"] >= RATE_LIMIT_MIN_REMAINING:
+        return
+    reset_at = datetime.fromisoformat(rate_limit["resetAt"].replace("Z", "+00:00"))
+    wait = max((reset_at - datetime.now(timezone.utc)).total_seconds(), 0) + 1
+    print(f"AVISO: Rate limit quase esgotado. Aguardando {wait:.0f}s...")
+    time.sleep(wait)
+
 
-        # --- ALTERAÇÃO: Passando a constante REPOS_PER_PAGE para a query ---
-        variables = {"cursor": cursor, "perPage": REPOS_PER_PAGE}
+def load_cached_repo_list():
+    """Retorna a lista de repositórios salva em disco, se ainda estiver dentro do TTL."""
+    try:
+        if time.time() - os.path.getmtime(REPO_LIST_CACHE_FILE) > REPO_LIST_CACHE_TTL:
+            return None
+        with open(REPO_LIST_CACHE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def fetch_star_range(star_range):
+    """Pagina a busca de repositórios Java de uma faixa de estrelas.
+
+    Retorna a lista de (nameWithOwner, stargazerCount) e se a faixa foi lida por completo.
+    """
+    search_query = f"language:Java stars:{star_range} sort:stars-desc"
+    repos = []
+    cursor = None
+    for page_num in range(1, SEARCH_RESULTS_LIMIT // REPOS_PER_PAGE + 1):
+        print(f"Buscando página {page_num} da faixa stars:{star_range}...")
+        variables = {
+            "searchQuery": search_query,
+            "cursor": cursor,
+            "perPage": REPOS_PER_PAGE,
+        }
         response_data = run_graphql_query(SEARCH_JAVA_REPOS_QUERY, variables)
 
         if not response_data:
-            break
+            return repos, False
         search_results = response_data.get("data", {}).get("search", {})
-        all_repos.extend(
-            repo["nameWithOwner"] for repo in search_results.get("nodes", []) if repo
+        repos.extend(
+            (repo["nameWithOwner"], repo["stargazerCount"])
+            for repo in search_results.get("nodes", [])
+            if repo
         )
         page_info = search_results.get("pageInfo", {})
         cursor = page_info.get("endCursor")
         if not page_info.get("hasNextPage"):
-            print("INFO: API informou que não há mais páginas.")
             break
-        time.sleep(1)
+        wait_for_rate_limit(response_data.get("data", {}).get("rateLimit"))
+    return repos, True
+
+
+def fetch_top_java_repos():
+    """Busca a lista dos 1000 repositórios Java mais populares.
+
+    Cada faixa de STAR_RANGES é paginada em uma thread; os resultados são
+    unidos, deduplicados e ordenados por estrelas.
+    """
+    print("--- ETAPA 1: Buscando a lista de repositórios Java no GitHub ---")
+    cached_repos = load_cached_repo_list()
+    if cached_repos:
+        print(
+            f"Lista com {len(cached_repos)} repositórios carregada de '{REPO_LIST_CACHE_FILE}'."
+        )
+        return cached_repos
+
+    stars_by_repo = {}
+    complete = True
+    with ThreadPoolExecutor(max_workers=MAX_SEARCH_WORKERS) as executor:
+        for star_range, (repos, range_complete) in zip(
+            STAR_RANGES, executor.map(fetch_star_range, STAR_RANGES)
+        ):
+            complete = complete and range_complete
+            if len(repos) >= SEARCH_RESULTS_LIMIT and star_range != STAR_RANGES[-1]:
+                print(f"AVISO: Faixa stars:{star_range} truncada em {len(repos)}.")
+            stars_by_repo.update(repos)
+
+    ranked = sorted(stars_by_repo, key=stars_by_repo.get, reverse=True)
+    all_repos = ranked[:TOP_REPOS_COUNT]
+    complete = complete and len(all_repos) == TOP_REPOS_COUNT
     print(f"Sucesso! Lista com {len(all_repos)} repositórios coletada.")
+
+    # Só guarda em cache listas completas, para não reaproveitar uma coleta parcial
+    if complete:
+        with open(REPO_LIST_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(all_repos, f)
     return all_repos
 
 
@@ -113,22 +238,58 @@ def fetch_top_java_repos():
 
 
 def clone_repo_if_not_exists(repo_url, dest_dir):
-    """Clona um repositório apenas se o diretório de destino não existir."""
+    """Clona um repositório apenas se o diretório de destino não existir.
+
+    Usa um clone raso e parcial (`--filter=blob:none`) com sparse-checkout só dos
+    arquivos `.java`: apenas o código que o CK analisa é baixado e escrito em disco.
+    """
     if os.path.exists(dest_dir):
         print(f"Repositório já existe em '{dest_dir}'. Pulando clone.")
         return
     print(f"Clonando repositório de {repo_url} para '{dest_dir}'...")
-    Repo.clone_from(repo_url, dest_dir, depth=1)
+    git_commands = [
+        [
+            "git",
+            "clone",
+            "--depth=1",
+            "--filter=blob:none",
+            "--single-branch",
+            "--no-checkout",
+            repo_url,
+            dest_dir,
+        ],
+        ["git", "-C", dest_dir, "sparse-checkout", "set", "--no-cone", "*.java"],
+        ["git", "-C", dest_dir, "checkout"],
+    ]
+    for cmd in git_commands:
+        subprocess.run(cmd, check=True, capture_output=True, text=True)
+
+
+def get_remote_head_sha(repo_url):
+    """Retorna o SHA do HEAD remoto do repositório (sem clonar), ou None em caso de falha."""
+    result = subprocess.run(
+        ["git", "ls-remote", repo_url, "HEAD"], capture_output=True, text=True
+    )
+    if result.returncode != 0 or not result.stdout:
+        return None
+    return result.stdout.split()[0]
 
 
 def run_ck(jar_path, repo_dir, output_dir):
     """Executa o CK Tool e retorna o caminho para o class.csv."""
-    if os.path.exists(output_dir):
-        shutil.rmtree(output_dir, onerror=remove_readonly)
-    os.makedirs(output_dir)
-
     print(f"Executando CK Tool no diretório '{repo_dir}'...")
-    cmd = ["java", "-jar", jar_path, repo_dir, "true", "0", "true", output_dir + os.sep]
+    cmd = [
+        "java",
+        CK_MAX_HEAP,
+        *CK_JVM_FLAGS,
+        "-jar",
+        jar_path,
+        repo_dir,
+        "true",
+        "0",
+        "true",
+        output_dir + os.sep,
+    ]
     try:
         subprocess.run(cmd, check=True, capture_output=True, text=True)
     except subprocess.CalledProcessError as e:
@@ -141,6 +302,66 @@ def run_ck(jar_path, repo_dir, output_dir):
     return class_csv_path
 
 
+def process_repo(repo_name):
+    """Clona, roda o CK e carrega as métricas de classe de um repositório.
+
+    O resultado é guardado em CK_CACHE_DIR com o SHA do HEAD remoto no nome; se o
+    repositório não mudou desde a última execução, clone e CK são pulados.
+
+    Retorna uma tabela Arrow com `repository` e as colunas de CK_COLUMNS, ou None em caso de falha.
+    """
+    repo_url = f"https://github.com/{repo_name}.git"
+
+    folder_name = repo_name.replace("/", "_")
+    repo_path = os.path.join(REPOS_BASE_DIR, folder_name)
+    ck_output_path = None
+    # Só o clone feito por esta chamada é removido no final; um checkout que já
+    # existia antes (reaproveitado por clone_repo_if_not_exists) é preservado
+    cloned_here = False
+
+    try:
+        sha = get_remote_head_sha(repo_url)
+        cache_path = (
+            os.path.join(CK_CACHE_DIR, f"{folder_name}_{sha}.parquet") if sha else None
+        )
+        if cache_path and os.path.exists(cache_path):
+            print(f"Métricas de {repo_name} ({sha[:7]}) carregadas do cache.")
+            return pq.read_table(cache_path)
+
+        # Cada execução do CK usa um diretório temporário próprio: não há limpeza
+        # prévia de saídas antigas nem disputa entre análises em paralelo.
+        ck_output_path = tempfile.mkdtemp(prefix="ck_", dir=RESULT_BASE_PATH)
+        cloned_here = not os.path.exists(repo_path)
+        clone_repo_if_not_exists(repo_url, repo_path)
+        class_csv_path = run_ck(CK_JAR_PATH, repo_path, ck_output_path)
+
+        if not class_csv_path:
+            print(f"AVISO: Falha na análise do repositório {repo_name}. Pulando.")
+            return None
+
+        table = pa_csv.read_csv(class_csv_path, convert_options=CK_CONVERT_OPTIONS)
+        table = table.add_column(
+            0, "repository", pa.array([repo_name] * table.num_rows, pa.string())
+        )
+        if cache_path:
+            # Escrita atômica: um cache interrompido no meio nunca é reaproveitado
+            pq.write_table(table, cache_path + ".tmp", compression="zstd")
+            os.replace(cache_path + ".tmp", cache_path)
+        return table
+
+    except Exception as e:
+        print(f"ERRO inesperado ao processar {repo_name}: {e}. Pulando.")
+        return None
+
+    finally:
+        # O clone só é necessário durante a análise; removê-lo mantém o uso de disco
+        # limitado aos repositórios em processamento.
+        if cloned_here and os.path.exists(repo_path):
+            shutil.rmtree(repo_path, onerror=remove_readonly)
+        if ck_output_path:
+            shutil.rmtree(ck_output_path, ignore_errors=True)
+
+
 # --- 4. BLOCO DE EXECUÇÃO PRINCIPAL ---
 
 
@@ -160,50 +381,62 @@ def main():
         return
 
     print(f"\n--- ETAPA 2: Analisando {len(repo_list)} repositórios com o CK Tool ---")
-    all_metrics_dfs = []
+    os.makedirs(RESULT_BASE_PATH, exist_ok=True)
+    os.makedirs(CK_CACHE_DIR, exist_ok=True)
+    final_csv_path = os.path.join(RESULT_BASE_PATH, FINAL_CSV_FILE)
     total_repos = len(repo_list)
-
-    for i, repo_name in enumerate(repo_list):
-        print(f"\n[ Processando {i+1}/{total_repos} ]: {repo_name}")
-        repo_url = f"https://github.com/{repo_name}.git"
-
-        folder_name = repo_name.replace("/", "_")
-        repo_path = os.path.join(REPOS_BASE_DIR, folder_name)
-
-        ck_output_path = os.path.join(RESULT_BASE_PATH, folder_name + "_ck_output")
-
+    total_classes = 0
+    writer = None
+
+    # Os repositórios são processados em paralelo (clone + CK são dominados por I/O
+    # e por subprocessos). O CSV final é escrito incrementalmente, na ordem da
+    # lista, sem manter as métricas de todos os repositórios em memória; o
+    # cabeçalho é escrito junto com a primeira tabela. No máximo MAX_PENDING_REPOS
+    # ficam submetidos: um repositório lento segura só essa janela de tabelas prontas.
+    repos = iter(repo_list)
+    pending = deque()
+
+    def submit_next_repo():
+        repo_name = next(repos, None)
+        if repo_name is not None:
+            pending.append((repo_name, executor.submit(process_repo, repo_name)))
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
         try:
-            clone_repo_if_not_exists(repo_url, repo_path)
-            class_csv_path = run_ck(CK_JAR_PATH, repo_path, ck_output_path)
-
-            if class_csv_path:
-                df_class = pd.read_csv(class_csv_path)
-                df_class["repository"] = repo_name
-                all_metrics_dfs.append(df_class)
-                print(f"Sucesso! {len(df_class)} classes analisadas para {repo_name}.")
-            else:
-                print(f"AVISO: Falha na análise do repositório {repo_name}. Pulando.")
-
-        except Exception as e:
-            print(f"ERRO inesperado ao processar {repo_name}: {e}. Pulando.")
-            continue
-
-    if not all_metrics_dfs:
+            for _ in range(MAX_PENDING_REPOS):
+                submit_next_repo()
+            completed = 0
+            while pending:
+                repo_name, future = pending.popleft()
+                submit_next_repo()
+                table = future.result()
+                completed += 1
+                print(f"\n[ Concluído {completed}/{total_repos} ]: {repo_name}")
+                if table is None:
+                    continue
+
+                if writer is None:
+                    writer = pa_csv.CSVWriter(final_csv_path, table.schema)
+                writer.write_table(table)
+                total_classes += table.num_rows
+                print(f"Sucesso! {table.num_rows} classes analisadas para {repo_name}.")
+        finally:
+            # Em caso de interrupção, os repositórios ainda não iniciados são descartados
+            for _, future in pending:
+                future.cancel()
+            if writer is not None:
+                writer.close()
+
+    if total_classes == 0:
+        if os.path.exists(final_csv_path):
+            os.remove(final_csv_path)
         print("\nNenhuma métrica foi extraída com sucesso. Nenhum arquivo foi gerado.")
         return
 
-    print(f"\n--- ETAPA 3: Consolidando todos os dados em '{FINAL_CSV_FILE}' ---")
-    final_df = pd.concat(all_metrics_dfs, ignore_index=True)
-    cols = ["repository"] + [col for col in final_df.columns if col != "repository"]
-    final_df = final_df[cols]
-    final_df.to_csv(
-        RESULT_BASE_PATH + "/" + FINAL_CSV_FILE, index=False, encoding="utf-8"
-    )
+    print(f"\n--- ETAPA 3: Dados consolidados em '{FINAL_CSV_FILE}' ---")
     print(f"Arquivo final '{FINAL_CSV_FILE}' salvo com sucesso!")
-    print(f"Total de classes analisadas em todos os repositórios: {len(final_df)}")
-    print(
-        "\nProcesso concluído. Os repositórios clonados foram mantidos na pasta 'cloned_repos'."
-    )
+    print(f"Total de classes analisadas em todos os repositórios: {total_classes}")
+    print("\nProcesso concluído.")
 
 
 if __name__ == "__main__":
@@ -1,4 +1,7 @@
-import pandas as pd
+import sys
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 
 # Caminho para o seu arquivo CSV foi atualizado aqui
 file_path = (
@@ -6,25 +9,33 @@ file_path = (
 )
 
 try:
-    # Lê o arquivo CSV para um DataFrame do pandas
-    df = pd.read_csv(file_path)
+    # Lê do CSV apenas a coluna 'repository' (as demais nem são convertidas)
+    table = pa_csv.read_csv(
+        file_path,
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=["repository"],
+            column_types={"repository": pa.dictionary(pa.int32(), pa.string())},
+        ),
+    ).unify_dictionaries()
 
-    # 1. Seleciona a coluna 'repository'
-    # 2. Usa o método .unique() para obter apenas os nomes sem repetição
-    # 3. Converte o resultado para uma lista Python
-    unique_repositories = df["repository"].unique().tolist()
+    # Com a coluna lida como categórica, o dicionário (comum a todos os blocos
+    # após unify_dictionaries) já é o conjunto de nomes sem repetição, na ordem
+    # em que aparecem no arquivo.
+    column = table.column("repository")
+    unique_repositories = (
+        column.chunk(0).dictionary.to_pylist() if column.num_chunks else []
+    )
 
     print(f"Repositórios únicos encontrados em '{file_path}':")
     print("-" * 40)  # Adiciona uma linha para separar
 
-    # Itera sobre a lista de repositórios únicos e imprime cada um
-    for repo in unique_repositories:
-        print(repo)
+    # Imprime todos os repositórios únicos de uma só vez
+    sys.stdout.write("\n".join(unique_repositories) + "\n")
 
 except FileNotFoundError:
     print(f"ERRO: O arquivo não foi encontrado no caminho especificado: '{file_path}'")
     print("Verifique se o script está sendo executado da pasta correta.")
-except KeyError:
+except (KeyError, pa.ArrowInvalid):
     print(f"ERRO: A coluna 'repository' não foi encontrada no arquivo CSV.")
     print("Verifique se o cabeçalho do seu CSV está correto.")
 except Exception as e:
@@ -1,9 +1,16 @@
 # pr_dataset_pipeline.py
 import os
+import csv
+import hashlib
+import orjson
 import requests
 import time
+import itertools
+import threading
 import pandas as pd
-from datetime import datetime, timezone, timedelta
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
 # --- 1. CONFIGURAÇÕES E CONSTANTES ---
@@ -31,19 +38,65 @@ TARGET_REPOS_COUNT = 201
 MIN_PR_COUNT = 50
 MIN_REVIEW_COUNT = 1
 MIN_DURATION_HOURS = 1
+MIN_DURATION = timedelta(hours=MIN_DURATION_HOURS)
 
 # Constantes de Controle da API
-PRS_PER_PAGE = 50  # Um bom equilíbrio entre quantidade de dados e tempo de resposta
+PRS_PER_PAGE = 100  # Máximo da API; cada nó da página traz só os campos dos filtros
 # 50 por página x 10 páginas = 500 candidatos
 PAGES_TO_FETCH_REPOS = 10
 REPOS_PER_PAGE = 50
 MAX_RETRIES = 5
 RETRY_DELAY = 5
+# Cache em disco das respostas da API (reexecuções não refazem as mesmas queries)
+CACHE_DIR = ".cache_graphql"
+CACHE_TTL_SECONDS = 24 * 60 * 60
+# Lotes de repositórios cujos PRs são coletados em paralelo (respeita o rate limit secundário do GitHub)
+MAX_CONCURRENT_BATCHES = 2
+# Repositórios consultados em uma mesma query GraphQL (um alias por repositório)
+REPOS_PER_BATCH = 5
+# Abaixo desta cota restante as requisições são espaçadas até o reset do rate limit
+RATE_LIMIT_PACING_THRESHOLD = 500
+
+# Último estado do rate limit informado pela API (X-RateLimit-Remaining/Reset),
+# compartilhado entre as threads de coleta
+rate_limit_state = {"remaining": None, "reset": None}
+rate_limit_lock = threading.Lock()
+
+# Sessão reutilizada em todas as queries: mantém as conexões TLS abertas (keep-alive)
+# em vez de abrir uma nova conexão por requisição; o pool comporta os lotes paralelos.
+# Com o pacote `brotli` instalado, o requests já anuncia "br" no Accept-Encoding
+# (além de gzip) e descomprime as respostas automaticamente.
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount(
+    "https://",
+    requests.adapters.HTTPAdapter(
+        pool_connections=1, pool_maxsize=MAX_CONCURRENT_BATCHES
+    ),
+)
 
 # Constantes de Saída
 REPO_LIST_CSV_FILE = "selected_repositories.csv"
 FINAL_CSV_FILE = "github_prs_dataset.csv"
 RESULT_DIR = "result"
+# Colunas do dataset final, com `title` por último
+PR_CSV_COLUMNS = [
+    "repository",
+    "pr_number",
+    "state",
+    "review_count",
+    "created_at",
+    "closed_at",
+    "duration_hours",
+    "changed_files",
+    "additions",
+    "deletions",
+    "participants_count",
+    "issue_comments_count",
+    "review_threads_count",
+    "comments_total",
+    "title",
+]
 
 
 # --- 2. LÓGICA DE COLETA DE DADOS (GraphQL) ---
@@ -70,60 +123,164 @@ query SearchPopularRepos($cursor: String, $perPage: Int!) {
 }
 """
 
-SEARCH_PRS_QUERY = """
-query SearchPullRequests($owner: String!, $name: String!, $cursor: String, $perPage: Int!) {
-  repository(owner: $owner, name: $name) {
-    pullRequests(states: [MERGED, CLOSED], first: $perPage, after: $cursor, orderBy: {field: CREATED_AT, direction: DESC}) {
-      pageInfo {
-        endCursor
-        hasNextPage
-      }
-      nodes {
-        number
-        title
-        state
-        createdAt
-        mergedAt
-        closedAt
-        changedFiles
-        additions
-        deletions
-        participants {
-          totalCount
-        }
-        comments {
-          totalCount
-        }
-        reviewThreads {
-          totalCount
-        }
-        reviews(first: 1) {
-          totalCount
-        }
-      }
+# Campos de cada página de PRs, reaproveitados por todos os aliases da query em lote.
+# Só traz o necessário para os filtros (revisões e duração); o restante vem depois.
+PULL_REQUEST_PAGE_FRAGMENT = """
+fragment PullRequestPage on PullRequestConnection {
+  pageInfo {
+    endCursor
+    hasNextPage
+  }
+  nodes {
+    number
+    createdAt
+    mergedAt
+    closedAt
+    reviews(first: 1) {
+      totalCount
     }
   }
 }
 """
 
+# Campos "pesados" de um PR, buscados apenas para os PRs que passaram nos filtros
+PULL_REQUEST_DETAILS_FRAGMENT = """
+fragment PullRequestDetails on PullRequest {
+  title
+  state
+  changedFiles
+  additions
+  deletions
+  participants {
+    totalCount
+  }
+  comments {
+    totalCount
+  }
+  reviewThreads {
+    totalCount
+  }
+}
+"""
+
+
+def rate_limit_wait(response):
+    """Calcula quantos segundos aguardar a partir dos headers de rate limit.
+
+    Retorna None se a resposta não indicar limite de requisições.
+    """
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        return float(retry_after)
+    if response.headers.get("X-RateLimit-Remaining") == "0":
+        reset_at = float(response.headers.get("X-RateLimit-Reset", time.time()))
+        return max(reset_at - time.time(), 0) + 1
+    return None
+
+
+def update_rate_limit_state(response):
+    """Guarda a cota restante e o horário de reset informados nos headers da resposta."""
+    remaining = response.headers.get("X-RateLimit-Remaining")
+    reset_at = response.headers.get("X-RateLimit-Reset")
+    if remaining is None or reset_at is None:
+        return
+    with rate_limit_lock:
+        rate_limit_state["remaining"] = int(remaining)
+        rate_limit_state["reset"] = float(reset_at)
+
+
+def rate_limit_pacing_delay():
+    """Segundos a aguardar antes da próxima requisição (token bucket).
+
+    Com cota folgada não há espera; abaixo de RATE_LIMIT_PACING_THRESHOLD o tempo até o
+    reset é dividido igualmente entre as requisições restantes.
+    """
+    with rate_limit_lock:
+        remaining = rate_limit_state["remaining"]
+        reset_at = rate_limit_state["reset"]
+    if remaining is None or remaining >= RATE_LIMIT_PACING_THRESHOLD:
+        return 0
+    return max(reset_at - time.time(), 0) / max(remaining, 1)
+
+
+def cache_path(query, variables):
+    """Caminho do arquivo de cache para o par (query, variáveis)."""
+    key = hashlib.sha1(
+        query.encode("utf-8") + orjson.dumps(variables, option=orjson.OPT_SORT_KEYS)
+    ).hexdigest()
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+
+def load_cached(path):
+    """Retorna a resposta em cache se existir e ainda estiver dentro do TTL."""
+    try:
+        if time.time() - os.path.getmtime(path) > CACHE_TTL_SECONDS:
+            return None
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def save_cached(path, response_data):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(orjson.dumps(response_data))
+    os.replace(tmp_path, path)
+
+
+def run_graphql_query(query, variables, allow_partial=False):
+    """Função genérica para executar uma query GraphQL com lógica de retry e cache em disco.
+
+    Com `allow_partial`, uma resposta com `errors` mas com `data` é devolvida (sem ir
+    para o cache): em queries com aliases, só os aliases que falharam vêm nulos.
+    """
+    path = cache_path(query, variables)
+    cached = load_cached(path)
+    if cached is not None:
+        return cached
 
-def run_graphql_query(query, variables):
-    """Função genérica para executar uma query GraphQL com lógica de retry."""
     for attempt in range(MAX_RETRIES):
         try:
-            response = requests.post(
+            delay = rate_limit_pacing_delay()
+            if delay > 0:
+                time.sleep(delay)
+            response = SESSION.post(
                 GITHUB_API_URL,
-                headers=HEADERS,
-                json={"query": query, "variables": variables},
+                data=orjson.dumps({"query": query, "variables": variables}),
                 timeout=60,
             )
-            response.raise_for_status()
-            response_data = response.json()
+            update_rate_limit_state(response)
+            # O status é tratado antes de qualquer parsing: erros transitórios (5xx)
+            # voltam ao loop com backoff, rate limit espera o tempo indicado pela API
+            # e os demais erros do cliente (4xx) não são repetidos.
+            if response.status_code in (403, 429):
+                wait = rate_limit_wait(response)
+                if wait is not None:
+                    print(
+                        f"AVISO: Rate limit atingido. Aguardando {wait:.0f}s... (Tentativa {attempt + 1}/{MAX_RETRIES})"
+                    )
+                    time.sleep(wait)
+                    continue
+            if response.status_code >= 500:
+                print(
+                    f"AVISO: Recebido status {response.status_code}. Tentando novamente... (Tentativa {attempt + 1}/{MAX_RETRIES})"
+                )
+                time.sleep(RETRY_DELAY * (attempt + 1))
+                continue
+            if response.status_code != 200:
+                print(f"ERRO: Status {response.status_code} da API: {response.text[:200]}")
+                return None
+            response_data = orjson.loads(response.content)
             if "errors" in response_data:
                 print(f"ERRO GraphQL: {response_data['errors']}")
+                if allow_partial and response_data.get("data"):
+                    return response_data
                 return None
+            save_cached(path, response_data)
             return response_data
-        except requests.RequestException as e:
+        except (requests.RequestException, orjson.JSONDecodeError) as e:
             print(
                 f"ERRO de requisição: {e}. Tentando novamente... (Tentativa {attempt + 1}/{MAX_RETRIES})"
             )
@@ -132,11 +289,55 @@ def run_graphql_query(query, variables):
     return None
 
 
-def parse_datetime(date_string):
-    """Converte uma string de data ISO 8601 para um objeto datetime ciente do fuso horário."""
-    if not date_string:
-        return None
-    return datetime.fromisoformat(date_string.replace("Z", "+00:00"))
+def build_batched_prs_query(batch):
+    """Monta uma única query GraphQL com um alias `rN` por repositório do lote.
+
+    `batch` é uma lista de (owner, name, cursor). Retorna a query e o dicionário de
+    variáveis (`oN`/`nN`/`cN` para owner/name/cursor).
+    """
+    params = ["$perPage: Int!"]
+    fields = []
+    variables = {"perPage": PRS_PER_PAGE}
+    for i, (owner, name, cursor) in enumerate(batch):
+        params.append(f"$o{i}: String!, $n{i}: String!, $c{i}: String")
+        fields.append(
+            f"  r{i}: repository(owner: $o{i}, name: $n{i}) {{\n"
+            f"    pullRequests(states: [MERGED, CLOSED], first: $perPage, after: $c{i}, "
+            "orderBy: {field: CREATED_AT, direction: DESC}) { ...PullRequestPage }\n"
+            "  }"
+        )
+        variables[f"o{i}"] = owner
+        variables[f"n{i}"] = name
+        variables[f"c{i}"] = cursor
+    query = (
+        f"query SearchPullRequests({', '.join(params)}) {{\n"
+        + "\n".join(fields)
+        + "\n}\n"
+        + PULL_REQUEST_PAGE_FRAGMENT
+    )
+    return query, variables
+
+
+def build_pr_details_query(owner, name, numbers):
+    """Monta uma query com um alias `pN` para cada PR (por número) do repositório.
+
+    Retorna a query e o dicionário de variáveis (`owner`/`name` e `pN` para os números).
+    """
+    params = ["$owner: String!, $name: String!"]
+    fields = []
+    variables = {"owner": owner, "name": name}
+    for i, number in enumerate(numbers):
+        params.append(f"$p{i}: Int!")
+        fields.append(f"    p{i}: pullRequest(number: $p{i}) {{ ...PullRequestDetails }}")
+        variables[f"p{i}"] = number
+    query = (
+        f"query FetchPullRequestDetails({', '.join(params)}) {{\n"
+        "  repository(owner: $owner, name: $name) {\n"
+        + "\n".join(fields)
+        + "\n  }\n}\n"
+        + PULL_REQUEST_DETAILS_FRAGMENT
+    )
+    return query, variables
 
 
 def fetch_popular_repos_with_prs_filter():
@@ -181,7 +382,6 @@ def fetch_popular_repos_with_prs_filter():
         if not page_info.get("hasNextPage"):
             print("INFO: API informou que não há mais páginas de repositórios.")
             break
-        time.sleep(1)
 
     print(
         f"Sucesso! {len(qualified_repos)} repositórios qualificados foram encontrados (limite {MAX_CANDIDATE_REPOS})."
@@ -189,106 +389,192 @@ def fetch_popular_repos_with_prs_filter():
     return qualified_repos
 
 
-def fetch_valid_prs_for_repo(repo_name):
-    """Busca e filtra os PRs de um único repositório de acordo com os critérios."""
-    valid_prs = []
-    owner, name = repo_name.split("/")
-    cursor = None
+def collect_valid_prs(prs, valid_prs):
+    """Filtra uma página de PRs de acordo com os critérios.
+
+    Acrescenta a `valid_prs` um par (pr, duração) para cada PR aprovado.
+    """
+    for pr in prs:
+        if not pr:
+            continue
 
-    print(f"  Analisando PRs para {repo_name}...")
+        # Filtro 1: Mínimo de 1 revisão
+        review_count = pr["reviews"]["totalCount"]
+        if review_count < MIN_REVIEW_COUNT:
+            continue
 
-    while True:
-        variables = {
-            "owner": owner,
-            "name": name,
-            "cursor": cursor,
-            "perPage": PRS_PER_PAGE,
-        }
-        response_data = run_graphql_query(SEARCH_PRS_QUERY, variables)
+        # Filtro 2: Duração mínima de 1 hora
+        # O momento final é `mergedAt` para PRs merged, ou `closedAt` para os demais
+        created_at = pr["createdAt"]
+        final_event_at = pr["mergedAt"] or pr["closedAt"]
 
-        if (
-            not response_data
-            or "data" not in response_data
-            or not response_data["data"].get("repository")
-        ):
-            break
+        if not created_at or not final_event_at:
+            continue
 
-        prs_data = response_data["data"]["repository"].get("pullRequests", {})
-        prs = prs_data.get("nodes", [])
+        # A API sempre devolve UTC no formato "AAAA-MM-DDTHH:MM:SSZ": basta comparar
+        # os datetimes sem fuso dos 19 primeiros caracteres.
+        duration = datetime.fromisoformat(final_event_at[:19]) - datetime.fromisoformat(
+            created_at[:19]
+        )
+        if duration >= MIN_DURATION:
+            valid_prs.append((pr, duration))
+            # Se já atingimos o alvo por repositório, encerramos a coleta deste repo
+            if len(valid_prs) >= TARGET_PRS_PER_REPO:
+                break
+
+
+def build_pr_record(repo_name, pr, duration):
+    """Monta a linha do dataset de um PR (campos dos filtros + detalhes)."""
+    # Métricas adicionais da PR
+    changed_files = pr.get("changedFiles")
+    additions = pr.get("additions")
+    deletions = pr.get("deletions")
+    participants_count = (
+        pr.get("participants", {}).get("totalCount") if pr.get("participants") else None
+    )
+    issue_comments_count = (
+        pr.get("comments", {}).get("totalCount") if pr.get("comments") else None
+    )
+    review_threads_count = (
+        pr.get("reviewThreads", {}).get("totalCount") if pr.get("reviewThreads") else None
+    )
+    # Comentários totais (issue comments + threads de review)
+    comments_total = None
+    if issue_comments_count is not None or review_threads_count is not None:
+        comments_total = (issue_comments_count or 0) + (review_threads_count or 0)
+    return {
+        "repository": repo_name,
+        "pr_number": pr["number"],
+        "title": pr.get("title"),
+        "state": pr.get("state"),
+        "review_count": pr["reviews"]["totalCount"],
+        "created_at": pr["createdAt"],
+        "closed_at": pr["mergedAt"] or pr["closedAt"],
+        "duration_hours": round(duration.total_seconds() / 3600, 2),
+        "changed_files": changed_files,
+        "additions": additions,
+        "deletions": deletions,
+        "participants_count": participants_count,
+        "issue_comments_count": issue_comments_count,
+        "review_threads_count": review_threads_count,
+        "comments_total": comments_total,
+    }
 
-        for pr in prs:
-            if not pr:
-                continue
 
-            # Filtro 1: Mínimo de 1 revisão
-            review_count = pr["reviews"]["totalCount"]
-            if review_count < MIN_REVIEW_COUNT:
-                continue
+def fetch_pr_details(repo_name, numbers):
+    """Busca os campos detalhados dos PRs informados, em uma única query.
 
-            # Filtro 2: Duração mínima de 1 hora
-            created_at = parse_datetime(pr["createdAt"])
+    Retorna um dicionário número -> campos do PR (vazio em caso de falha).
+    """
+    owner, name = repo_name.split("/")
+    query, variables = build_pr_details_query(owner, name, numbers)
+    response_data = run_graphql_query(query, variables)
+    if not response_data or not (response_data.get("data") or {}).get("repository"):
+        return {}
+    repository = response_data["data"]["repository"]
+    return {
+        number: repository[f"p{i}"]
+        for i, number in enumerate(numbers)
+        if repository.get(f"p{i}")
+    }
 
-            # O momento final é `mergedAt` para PRs merged, ou `closedAt` para os demais
-            final_event_at = parse_datetime(pr["mergedAt"] or pr["closedAt"])
 
-            if not created_at or not final_event_at:
-                continue
+def fetch_valid_prs_for_batch(repo_names):
+    """Busca e filtra os PRs de um lote de repositórios de acordo com os critérios.
 
-            duration = final_event_at - created_at
-            if duration >= timedelta(hours=MIN_DURATION_HOURS):
-                # Métricas adicionais da PR
-                changed_files = pr.get("changedFiles")
-                additions = pr.get("additions")
-                deletions = pr.get("deletions")
-                participants_count = (
-                    pr.get("participants", {}).get("totalCount") if pr.get("participants") else None
-                )
-                issue_comments_count = (
-                    pr.get("comments", {}).get("totalCount") if pr.get("comments") else None
-                )
-                review_threads_count = (
-                    pr.get("reviewThreads", {}).get("totalCount") if pr.get("reviewThreads") else None
-                )
-                # Comentários totais (issue comments + threads de review)
-                comments_total = None
-                if issue_comments_count is not None or review_threads_count is not None:
-                    comments_total = (issue_comments_count or 0) + (review_threads_count or 0)
-                valid_prs.append(
-                    {
-                        "repository": repo_name,
-                        "pr_number": pr["number"],
-                        "title": pr["title"],
-                        "state": pr["state"],
-                        "review_count": review_count,
-                        "created_at": pr["createdAt"],
-                        "closed_at": pr["mergedAt"] or pr["closedAt"],
-                        "duration_hours": round(duration.total_seconds() / 3600, 2),
-                        "changed_files": changed_files,
-                        "additions": additions,
-                        "deletions": deletions,
-                        "participants_count": participants_count,
-                        "issue_comments_count": issue_comments_count,
-                        "review_threads_count": review_threads_count,
-                        "comments_total": comments_total,
-                    }
-                )
-                # Se já atingimos o alvo por repositório, encerramos a coleta deste repo
-                if len(valid_prs) >= TARGET_PRS_PER_REPO:
-                    break
+    Todos os repositórios do lote que ainda têm páginas a ler são paginados juntos, em
+    uma única query por rodada. Retorna a lista de PRs válidos de cada repositório, na
+    ordem de `repo_names`.
+    """
+    valid_prs = {repo_name: [] for repo_name in repo_names}
+    cursors = {repo_name: None for repo_name in repo_names}
+    active = list(repo_names)
 
-        # Se batemos o limite no meio da página, não precisamos paginar mais
-        if len(valid_prs) >= TARGET_PRS_PER_REPO:
-            break
+    print(f"  Analisando PRs para {', '.join(repo_names)}...")
 
-        page_info = prs_data.get("pageInfo", {})
-        cursor = page_info.get("endCursor")
-        if not page_info.get("hasNextPage"):
+    while active:
+        batch = [(*repo_name.split("/"), cursors[repo_name]) for repo_name in active]
+        query, variables = build_batched_prs_query(batch)
+        # Um repositório renomeado, removido ou privado só anula o seu alias; os
+        # demais do lote continuam sendo paginados
+        response_data = run_graphql_query(query, variables, allow_partial=True)
+
+        if not response_data or not response_data.get("data"):
             break
-        # Pequeno delay para não sobrecarregar a API em repositórios com muitos PRs
-        time.sleep(0.5)
 
-    print(f"  -> Encontrados {len(valid_prs)} PRs válidos para {repo_name}.")
-    return valid_prs
+        still_active = []
+        for i, repo_name in enumerate(active):
+            repository = response_data["data"].get(f"r{i}")
+            if not repository:
+                print(f"  -> Repositório {repo_name} não retornado pela API. Pulando.")
+                continue
+
+            prs_data = repository.get("pullRequests", {})
+            collect_valid_prs(prs_data.get("nodes", []), valid_prs[repo_name])
+
+            # Se batemos o limite no meio da página, não precisamos paginar mais
+            if len(valid_prs[repo_name]) >= TARGET_PRS_PER_REPO:
+                continue
+
+            page_info = prs_data.get("pageInfo", {})
+            cursors[repo_name] = page_info.get("endCursor")
+            if page_info.get("hasNextPage"):
+                still_active.append(repo_name)
+        active = still_active
+
+    results = []
+    for repo_name in repo_names:
+        print(f"  -> Encontrados {len(valid_prs[repo_name])} PRs válidos para {repo_name}.")
+        candidates = valid_prs[repo_name][:TARGET_PRS_PER_REPO]
+        # Repositórios abaixo do alvo são descartados por main(); seus detalhes não
+        # são buscados (as linhas ficam só com os campos dos filtros).
+        details = {}
+        if len(candidates) >= TARGET_PRS_PER_REPO:
+            details = fetch_pr_details(repo_name, [pr["number"] for pr, _ in candidates])
+            # Sem os detalhes de todos os PRs o repositório não entra no dataset: as
+            # linhas sairiam com estado, tamanho e interações vazios
+            if len(details) < len(candidates):
+                print(
+                    f"  -> ERRO: detalhes de {len(candidates) - len(details)} PRs de {repo_name} não retornados. Pulando."
+                )
+                results.append([])
+                continue
+        results.append(
+            [
+                build_pr_record(repo_name, {**pr, **details.get(pr["number"], {})}, duration)
+                for pr, duration in candidates
+            ]
+        )
+    return results
+
+
+def fetch_prs_in_order(repo_list):
+    """Busca os PRs dos repositórios em lotes paralelos, entregando-os na ordem de `repo_list`.
+
+    Gera pares (repo_name, prs). No máximo MAX_CONCURRENT_BATCHES lotes ficam em
+    andamento: um novo só é iniciado quando o mais antigo é consumido, então ao
+    interromper a iteração nenhuma coleta além da janela é desperdiçada.
+    """
+    repos = iter(repo_list)
+
+    def submit_next_batch():
+        batch = list(itertools.islice(repos, REPOS_PER_BATCH))
+        if batch:
+            pending.append((batch, executor.submit(fetch_valid_prs_for_batch, batch)))
+
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_BATCHES) as executor:
+        pending = deque()
+        for _ in range(MAX_CONCURRENT_BATCHES):
+            submit_next_batch()
+        while pending:
+            batch, future = pending.popleft()
+            submit_next_batch()
+            try:
+                results = future.result()
+            except Exception as e:
+                print(f"ERRO inesperado ao processar {', '.join(batch)}: {e}. Pulando.")
+                results = [[] for _ in batch]
+            yield from zip(batch, results)
 
 
 # --- 3. BLOCO DE EXECUÇÃO PRINCIPAL ---
@@ -317,50 +603,45 @@ def main():
 
     # Etapa 2: Iterar sobre os repositórios e coletar PRs válidos, parando quando 201 repositórios atingirem 100 PRs
     print(f"\n--- ETAPA 2: Coletando PRs de até {len(repo_list)} repositórios (alvo: {TARGET_REPOS_COUNT} repos x {TARGET_PRS_PER_REPO} PRs) ---")
-    all_prs_data = []
     repos_completed = 0
+    total_prs = 0
     total_repos = len(repo_list)
+    output_path = os.path.join(RESULT_DIR, FINAL_CSV_FILE)
 
-    for i, repo_name in enumerate(repo_list):
-        # Pare se já atingimos o total de repositórios desejado
-        if repos_completed >= TARGET_REPOS_COUNT:
-            print(f"\nAlvo atingido: {repos_completed} repositórios com {TARGET_PRS_PER_REPO} PRs. Encerrando.")
-            break
+    # Os PRs de cada repositório que atinge o alvo são gravados no CSV assim que
+    # chegam, sem acumular o dataset inteiro em memória.
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=PR_CSV_COLUMNS, lineterminator="\n")
+        writer.writeheader()
 
-        print(f"\n[ Processando Repositório {i+1}/{total_repos} ]: {repo_name}")
-        try:
-            prs_for_repo = fetch_valid_prs_for_repo(repo_name)
+        for i, (repo_name, prs_for_repo) in enumerate(fetch_prs_in_order(repo_list)):
+            # Pare se já atingimos o total de repositórios desejado
+            if repos_completed >= TARGET_REPOS_COUNT:
+                print(f"\nAlvo atingido: {repos_completed} repositórios com {TARGET_PRS_PER_REPO} PRs. Encerrando.")
+                break
+
+            print(f"\n[ Processando Repositório {i+1}/{total_repos} ]: {repo_name}")
             if prs_for_repo:
                 # Se o repositório atingiu o alvo, só contamos se chegou a 100 PRs
                 if len(prs_for_repo) >= TARGET_PRS_PER_REPO:
                     # Garante que apenas 100 sejam adicionados, mesmo que por alguma razão passe do alvo
-                    all_prs_data.extend(prs_for_repo[:TARGET_PRS_PER_REPO])
+                    writer.writerows(prs_for_repo[:TARGET_PRS_PER_REPO])
+                    f.flush()
+                    total_prs += TARGET_PRS_PER_REPO
                     repos_completed += 1
                     print(f"  -> Repositório atingiu {TARGET_PRS_PER_REPO} PRs válidos. Total de repositórios completos: {repos_completed}/{TARGET_REPOS_COUNT}")
                 else:
                     # Caso não tenha atingido a meta, não conta para o total de repositórios completos
                     print(f"  -> Repositório NÃO atingiu {TARGET_PRS_PER_REPO} PRs válidos (obteve {len(prs_for_repo)}).")
-        except Exception as e:
-            print(f"ERRO inesperado ao processar {repo_name}: {e}. Pulando.")
-            continue
 
-    if not all_prs_data:
+    if total_prs == 0:
+        os.remove(output_path)
         print("\nNenhum PR que atenda a todos os critérios foi encontrado.")
         return
 
-    # Etapa 3: Consolidar os dados em um único arquivo CSV
-    print(f"\n--- ETAPA 3: Consolidando todos os dados em '{FINAL_CSV_FILE}' ---")
-    final_df = pd.DataFrame(all_prs_data)
-    # Garante que a coluna 'title' seja a última no CSV
-    if "title" in final_df.columns:
-        cols = [c for c in final_df.columns if c != "title"] + ["title"]
-        final_df = final_df[cols]
-
-    output_path = os.path.join(RESULT_DIR, FINAL_CSV_FILE)
-    final_df.to_csv(output_path, index=False, encoding="utf-8")
-
+    print(f"\n--- ETAPA 3: Dados consolidados em '{FINAL_CSV_FILE}' ---")
     print(f"Arquivo final '{output_path}' salvo com sucesso!")
-    print(f"Total de Pull Requests coletados no dataset: {len(final_df)}")
+    print(f"Total de Pull Requests coletados no dataset: {total_prs}")
     print("\nProcesso concluído.")
 
 
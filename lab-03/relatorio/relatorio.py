@@ -1,36 +1,54 @@
 import pandas as pd
 import numpy as np
 from scipy import stats
+import matplotlib
+matplotlib.use('Agg')  # Só gera arquivos PNG: dispensa a inicialização de backend gráfico
 import matplotlib.pyplot as plt
 import seaborn as sns
 import warnings
-import base64
-from io import BytesIO
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 warnings.filterwarnings('ignore')
 
 # Configurações de visualização
 plt.style.use('seaborn-v0_8-darkgrid')
 sns.set_palette("husl")
+# Estilo padrão de títulos e rótulos dos gráficos, definido uma vez para todas as figuras
+plt.rcParams.update({'axes.titlesize': 11, 'axes.titleweight': 'bold', 'axes.titlepad': 10,
+                     'axes.labelsize': 10,
+                     'figure.titlesize': 14, 'figure.titleweight': 'bold'})
+
+# Pasta (relativa ao HTML) onde os gráficos são salvos
+GRAFICOS_DIR = 'graficos'
+# Máximo aproximado de pontos desenhados por gráfico de dispersão (as correlações
+# continuam calculadas sobre todos os PRs; só o desenho é amostrado)
+MAX_PONTOS_DISPERSAO = 2000
 
 # ==========================================
-# FUNÇÃO PARA CONVERTER IMAGEM EM BASE64
+# FUNÇÃO PARA SALVAR IMAGEM EM ARQUIVO
 # ==========================================
-def fig_to_base64(fig):
-    """Converte figura matplotlib em string base64 para embedding em HTML"""
-    buffer = BytesIO()
-    fig.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
-    buffer.seek(0)
-    image_base64 = base64.b64encode(buffer.read()).decode()
-    plt.close(fig)
-    return f"data:image/png;base64,{image_base64}"
+def fig_to_file(fig, nome):
+    """Salva a figura matplotlib em GRAFICOS_DIR e retorna o caminho para referenciar no HTML.
+
+    Não fecha a figura: é chamada em paralelo pelas threads de codificação e o
+    fechamento (que mexe no estado global do pyplot) fica com a thread principal.
+    """
+    caminho = f"{GRAFICOS_DIR}/{nome}.png"
+    # 150 dpi é suficiente para visualização no navegador (300 só faz sentido para impressão)
+    fig.savefig(caminho, format='png', dpi=150, bbox_inches='tight')
+    return caminho
 
 # ==========================================
 # 1. CARREGAMENTO E PREPARAÇÃO DOS DADOS
 # ==========================================
 
-# Carregar o dataset
-df = pd.read_csv('github_prs_dataset.csv', sep=';')
+# Carregar o dataset com o leitor do PyArrow: colunas já nascem em Arrow, com tipos
+# inteiros explícitos para as contagens (created_at/closed_at são lidas como timestamp)
+df = pd.read_csv('github_prs_dataset.csv', sep=';', engine='pyarrow', dtype_backend='pyarrow',
+                 dtype={'review_count': 'int16[pyarrow]', 'participants_count': 'int16[pyarrow]',
+                        'changed_files': 'int32[pyarrow]', 'additions': 'int32[pyarrow]',
+                        'deletions': 'int32[pyarrow]', 'comments_total': 'int32[pyarrow]'})
 
 print("=" * 80)
 print("RELATÓRIO DE ANÁLISE - LABORATÓRIO 03")
@@ -49,7 +67,8 @@ print(dist_status)
 
 # Criar variáveis derivadas
 df['total_lines_changed'] = df['additions'] + df['deletions']
-df['description_length'] = df['title'].fillna('').str.len()
+# Comprimento do título em caracteres pelo kernel UTF-8 do PyArrow (títulos ausentes = 0)
+df['description_length'] = df['title'].str.len().fillna(0).astype('int64')
 
 # ==========================================
 # 2. ANÁLISE DESCRITIVA GERAL
@@ -62,10 +81,29 @@ print("=" * 80)
 metricas = ['changed_files', 'additions', 'deletions', 'total_lines_changed', 
             'duration_hours', 'participants_count', 'comments_total', 'review_count']
 
-desc_stats = df[metricas + ['state']].groupby('state').describe()
+# Medianas de todas as métricas por status (MERGED/CLOSED), em uma única agregação
+medianas_por_status = df.groupby('state')[metricas + ['description_length']].median()
+
+# Teste de Mann-Whitney (MERGED x CLOSED) de todas as métricas das RQs 01-04 em uma
+# única chamada vetorizada (uma coluna por métrica; NaNs ignorados coluna a coluna).
+# Com milhares de PRs por grupo o teste exato é inviável: o método assintótico é
+# fixado para pular a escolha automática (mantendo a correção de continuidade)
+metricas_teste = ['changed_files', 'additions', 'deletions', 'total_lines_changed',
+                  'duration_hours', 'description_length', 'participants_count', 'comments_total']
+merged_df = df[df['state'] == 'MERGED']
+closed_df = df[df['state'] == 'CLOSED']
+mann_whitney = stats.mannwhitneyu(
+    merged_df[metricas_teste].to_numpy(dtype=float),
+    closed_df[metricas_teste].to_numpy(dtype=float),
+    axis=0,
+    method='asymptotic',
+    nan_policy='omit'
+)
+p_valores_mw = dict(zip(metricas_teste, mann_whitney.pvalue))
 
-# Calcular medianas gerais
-medianas_gerais = {metrica: df[metrica].median() for metrica in metricas}
+# Mediana, média e desvio padrão gerais de todas as métricas em uma única agregação
+# (usadas no resumo CSV)
+estatisticas_gerais = df[metricas].agg(['median', 'mean', 'std'])
 
 # ==========================================
 # FUNÇÕES AUXILIARES
@@ -92,6 +130,17 @@ def interpretar_correlacao(corr):
     else:
         return "forte"
 
+# Correlações de Spearman de cada métrica com review_count (RQs 05-08), calculadas uma
+# vez por métrica e reaproveitadas nos gráficos. Cada par descarta só os PRs com valor
+# ausente nas suas duas colunas.
+correlacoes_spearman = {
+    metrica: calcular_correlacao(df, metrica, 'review_count', 'spearman')
+    for metrica in metricas_teste
+}
+rho_spearman = {metrica: r[0] for metrica, r in correlacoes_spearman.items()}
+p_spearman = {metrica: r[1] for metrica, r in correlacoes_spearman.items()}
+n_spearman = {metrica: r[2] for metrica, r in correlacoes_spearman.items()}
+
 # ==========================================
 # 3. ANÁLISE DAS QUESTÕES DE PESQUISA
 # ==========================================
@@ -113,13 +162,10 @@ rq01_resultados = []
 metricas_tamanho = ['changed_files', 'additions', 'deletions', 'total_lines_changed']
 
 for metrica in metricas_tamanho:
-    mediana_merged = df[df['state'] == 'MERGED'][metrica].median()
-    mediana_closed = df[df['state'] == 'CLOSED'][metrica].median()
+    mediana_merged = medianas_por_status.loc['MERGED', metrica]
+    mediana_closed = medianas_por_status.loc['CLOSED', metrica]
     
-    statistic, p_valor = stats.mannwhitneyu(
-        df[df['state'] == 'MERGED'][metrica].dropna(),
-        df[df['state'] == 'CLOSED'][metrica].dropna()
-    )
+    p_valor = p_valores_mw[metrica]
     
     resultado = {
         'metrica': metrica,
@@ -144,13 +190,10 @@ resultados_rqs['rq01'] = rq01_resultados
 print("\n\nRQ 02: Qual a relação entre o tempo de análise e o feedback final?")
 print("-" * 80)
 
-mediana_merged_time = df[df['state'] == 'MERGED']['duration_hours'].median()
-mediana_closed_time = df[df['state'] == 'CLOSED']['duration_hours'].median()
+mediana_merged_time = medianas_por_status.loc['MERGED', 'duration_hours']
+mediana_closed_time = medianas_por_status.loc['CLOSED', 'duration_hours']
 
-statistic, p_valor = stats.mannwhitneyu(
-    df[df['state'] == 'MERGED']['duration_hours'].dropna(),
-    df[df['state'] == 'CLOSED']['duration_hours'].dropna()
-)
+p_valor = p_valores_mw['duration_hours']
 
 rq02_resultado = {
     'mediana_merged': mediana_merged_time,
@@ -171,13 +214,10 @@ resultados_rqs['rq02'] = rq02_resultado
 print("\n\nRQ 03: Qual a relação entre a descrição dos PRs e o feedback final?")
 print("-" * 80)
 
-mediana_merged_desc = df[df['state'] == 'MERGED']['description_length'].median()
-mediana_closed_desc = df[df['state'] == 'CLOSED']['description_length'].median()
+mediana_merged_desc = medianas_por_status.loc['MERGED', 'description_length']
+mediana_closed_desc = medianas_por_status.loc['CLOSED', 'description_length']
 
-statistic, p_valor = stats.mannwhitneyu(
-    df[df['state'] == 'MERGED']['description_length'].dropna(),
-    df[df['state'] == 'CLOSED']['description_length'].dropna()
-)
+p_valor = p_valores_mw['description_length']
 
 rq03_resultado = {
     'mediana_merged': mediana_merged_desc,
@@ -199,16 +239,16 @@ print("\n\nRQ 04: Qual a relação entre as interações nos PRs e o feedback fi
 print("-" * 80)
 
 rq04_resultados = []
+rq08_resultados = []
 metricas_interacao = ['participants_count', 'comments_total']
 
+# RQ04 e RQ08 analisam as mesmas colunas de interação: os resultados das duas são
+# montados em uma única passada por métrica (a RQ08 só é impressa mais adiante)
 for metrica in metricas_interacao:
-    mediana_merged = df[df['state'] == 'MERGED'][metrica].median()
-    mediana_closed = df[df['state'] == 'CLOSED'][metrica].median()
+    mediana_merged = medianas_por_status.loc['MERGED', metrica]
+    mediana_closed = medianas_por_status.loc['CLOSED', metrica]
     
-    statistic, p_valor = stats.mannwhitneyu(
-        df[df['state'] == 'MERGED'][metrica].dropna(),
-        df[df['state'] == 'CLOSED'][metrica].dropna()
-    )
+    p_valor = p_valores_mw[metrica]
     
     resultado = {
         'metrica': metrica,
@@ -218,6 +258,17 @@ for metrica in metricas_interacao:
         'significativo': p_valor < 0.05
     }
     rq04_resultados.append(resultado)
+
+    corr_spearman, p_valor_spearman = rho_spearman[metrica], p_spearman[metrica]
+    corr_pearson, p_valor_pearson, _ = calcular_correlacao(df, metrica, 'review_count', 'pearson')
+    rq08_resultados.append({
+        'metrica': metrica,
+        'spearman': corr_spearman,
+        'p_spearman': p_valor_spearman,
+        'pearson': corr_pearson,
+        'p_pearson': p_valor_pearson,
+        'interpretacao': interpretar_correlacao(corr_spearman)
+    })
     
     print(f"\n{metrica}:")
     print(f"  Mediana MERGED: {mediana_merged:.2f}")
@@ -234,7 +285,7 @@ print("-" * 80)
 
 rq05_resultados = []
 for metrica in metricas_tamanho:
-    corr_spearman, p_valor_spearman, n = calcular_correlacao(df, metrica, 'review_count', 'spearman')
+    corr_spearman, p_valor_spearman = rho_spearman[metrica], p_spearman[metrica]
     corr_pearson, p_valor_pearson, _ = calcular_correlacao(df, metrica, 'review_count', 'pearson')
     
     resultado = {
@@ -244,7 +295,7 @@ for metrica in metricas_tamanho:
         'pearson': corr_pearson,
         'p_pearson': p_valor_pearson,
         'interpretacao': interpretar_correlacao(corr_spearman),
-        'n': n
+        'n': n_spearman[metrica]
     }
     rq05_resultados.append(resultado)
     
@@ -260,7 +311,7 @@ resultados_rqs['rq05'] = rq05_resultados
 print("\n\nRQ 06: Qual a relação entre o tempo de análise e o número de revisões?")
 print("-" * 80)
 
-corr_spearman, p_valor_spearman, n = calcular_correlacao(df, 'duration_hours', 'review_count', 'spearman')
+corr_spearman, p_valor_spearman = rho_spearman['duration_hours'], p_spearman['duration_hours']
 corr_pearson, p_valor_pearson, _ = calcular_correlacao(df, 'duration_hours', 'review_count', 'pearson')
 
 rq06_resultado = {
@@ -282,7 +333,7 @@ resultados_rqs['rq06'] = rq06_resultado
 print("\n\nRQ 07: Qual a relação entre a descrição dos PRs e o número de revisões?")
 print("-" * 80)
 
-corr_spearman, p_valor_spearman, n = calcular_correlacao(df, 'description_length', 'review_count', 'spearman')
+corr_spearman, p_valor_spearman = rho_spearman['description_length'], p_spearman['description_length']
 corr_pearson, p_valor_pearson, _ = calcular_correlacao(df, 'description_length', 'review_count', 'pearson')
 
 rq07_resultado = {
@@ -303,23 +354,10 @@ resultados_rqs['rq07'] = rq07_resultado
 print("\n\nRQ 08: Qual a relação entre as interações e o número de revisões?")
 print("-" * 80)
 
-rq08_resultados = []
-for metrica in metricas_interacao:
-    corr_spearman, p_valor_spearman, n = calcular_correlacao(df, metrica, 'review_count', 'spearman')
-    corr_pearson, p_valor_pearson, _ = calcular_correlacao(df, metrica, 'review_count', 'pearson')
-    
-    resultado = {
-        'metrica': metrica,
-        'spearman': corr_spearman,
-        'p_spearman': p_valor_spearman,
-        'pearson': corr_pearson,
-        'p_pearson': p_valor_pearson,
-        'interpretacao': interpretar_correlacao(corr_spearman)
-    }
-    rq08_resultados.append(resultado)
-    
-    print(f"\n{metrica}:")
-    print(f"  Spearman ρ = {corr_spearman:.4f} (p = {p_valor_spearman:.4f})")
+# Resultados já calculados junto com a RQ04
+for resultado in rq08_resultados:
+    print(f"\n{resultado['metrica']}:")
+    print(f"  Spearman ρ = {resultado['spearman']:.4f} (p = {resultado['p_spearman']:.4f})")
 
 resultados_rqs['rq08'] = rq08_resultados
 
@@ -331,7 +369,31 @@ print("\n\n" + "=" * 80)
 print("GERANDO VISUALIZAÇÕES...")
 print("=" * 80)
 
-graficos_base64 = {}
+# As figuras são montadas em sequência (pyplot não é thread-safe) e só codificadas
+# em PNG no final, em paralelo
+figuras = {}
+
+# Colunas numéricas usadas nos gráficos materializadas uma vez como arrays numpy
+# (NaN nos valores ausentes), junto com as máscaras de status
+colunas_plot = {c: df[c].to_numpy(dtype=float) for c in ['review_count'] + metricas_teste}
+mascara_merged = df['state'].eq('MERGED').to_numpy(dtype=bool, na_value=False)
+mascara_closed = df['state'].eq('CLOSED').to_numpy(dtype=bool, na_value=False)
+
+# Amostragem uniforme (a cada `passo` PRs) dos pontos dos gráficos de dispersão; os
+# PRs com o mínimo e o máximo de cada coluna sempre entram, preservando os eixos
+passo_dispersao = max(1, len(df) // MAX_PONTOS_DISPERSAO)
+indices_dispersao = np.union1d(
+    np.arange(0, len(df), passo_dispersao),
+    [f(valores) for valores in colunas_plot.values() for f in (np.nanargmin, np.nanargmax)]
+)
+colunas_dispersao = {c: valores[indices_dispersao] for c, valores in colunas_plot.items()}
+
+def boxplot_por_status(ax, metrica):
+    """Boxplot da métrica por status (mesma ordem de grupos do df.boxplot(by='state'))"""
+    valores = colunas_plot[metrica]
+    presentes = ~np.isnan(valores)
+    ax.boxplot([valores[mascara_closed & presentes], valores[mascara_merged & presentes]],
+               tick_labels=['CLOSED', 'MERGED'])
 
 # Gráfico RQ01
 fig, axes = plt.subplots(2, 2, figsize=(14, 10))
@@ -343,40 +405,34 @@ metricas_plot = [('changed_files', 'Arquivos Alterados'),
 
 for idx, (metrica, titulo) in enumerate(metricas_plot):
     ax = axes[idx // 2, idx % 2]
-    df.boxplot(column=metrica, by='state', ax=ax)
-    ax.set_title(titulo, fontsize=11, fontweight='bold', pad=10)
-    ax.set_xlabel('Status do PR', fontsize=10)
-    ax.set_ylabel('Quantidade', fontsize=10)
-    ax.get_figure().suptitle('')
-
-plt.suptitle('RQ01: Relação entre Tamanho dos PRs e Feedback Final', 
-             fontsize=14, fontweight='bold', y=0.995)
+    boxplot_por_status(ax, metrica)
+    ax.set(title=titulo, xlabel='Status do PR', ylabel='Quantidade')
+
+plt.suptitle('RQ01: Relação entre Tamanho dos PRs e Feedback Final', y=0.995)
 plt.tight_layout(rect=[0, 0, 1, 0.98])
-graficos_base64['rq01'] = fig_to_base64(fig)
+figuras['rq01'] = fig
 print("✓ Gráfico RQ01 gerado")
 
 # Gráfico RQ02
 fig, ax = plt.subplots(figsize=(10, 6))
-df.boxplot(column='duration_hours', by='state', ax=ax)
+boxplot_por_status(ax, 'duration_hours')
 ax.set_xlabel('Status do PR', fontsize=11)
 ax.set_ylabel('Duração (horas)', fontsize=11)
-ax.get_figure().suptitle('')
 plt.title('RQ02: Tempo de Análise por Status do PR', 
-          fontsize=13, fontweight='bold', pad=15)
+          fontsize=13, pad=15)
 plt.tight_layout()
-graficos_base64['rq02'] = fig_to_base64(fig)
+figuras['rq02'] = fig
 print("✓ Gráfico RQ02 gerado")
 
 # Gráfico RQ03
 fig, ax = plt.subplots(figsize=(10, 6))
-df.boxplot(column='description_length', by='state', ax=ax)
+boxplot_por_status(ax, 'description_length')
 ax.set_xlabel('Status do PR', fontsize=11)
 ax.set_ylabel('Comprimento (caracteres)', fontsize=11)
-ax.get_figure().suptitle('')
 plt.title('RQ03: Comprimento da Descrição por Status do PR', 
-          fontsize=13, fontweight='bold', pad=15)
+          fontsize=13, pad=15)
 plt.tight_layout()
-graficos_base64['rq03'] = fig_to_base64(fig)
+figuras['rq03'] = fig
 print("✓ Gráfico RQ03 gerado")
 
 # Gráfico RQ04
@@ -385,16 +441,12 @@ fig, axes = plt.subplots(1, 2, figsize=(14, 6))
 for idx, (metrica, titulo) in enumerate([('participants_count', 'Participantes'), 
                                           ('comments_total', 'Comentários Totais')]):
     ax = axes[idx]
-    df.boxplot(column=metrica, by='state', ax=ax)
-    ax.set_title(titulo, fontsize=11, fontweight='bold', pad=10)
-    ax.set_xlabel('Status do PR', fontsize=10)
-    ax.set_ylabel('Quantidade', fontsize=10)
-    ax.get_figure().suptitle('')
-
-plt.suptitle('RQ04: Interações nos PRs por Status', 
-             fontsize=14, fontweight='bold', y=0.995)
+    boxplot_por_status(ax, metrica)
+    ax.set(title=titulo, xlabel='Status do PR', ylabel='Quantidade')
+
+plt.suptitle('RQ04: Interações nos PRs por Status', y=0.995)
 plt.tight_layout(rect=[0, 0, 1, 0.98])
-graficos_base64['rq04'] = fig_to_base64(fig)
+figuras['rq04'] = fig
 print("✓ Gráfico RQ04 gerado")
 
 # Gráfico RQ05
@@ -402,63 +454,62 @@ fig, axes = plt.subplots(2, 2, figsize=(14, 10))
 
 for idx, (metrica, titulo) in enumerate(metricas_plot):
     ax = axes[idx // 2, idx % 2]
-    ax.scatter(df[metrica], df['review_count'], alpha=0.5, s=20)
-    ax.set_xlabel(titulo, fontsize=10)
-    ax.set_ylabel('Número de Revisões', fontsize=10)
-    ax.set_title(titulo, fontsize=11, fontweight='bold', pad=10)
+    ax.scatter(colunas_dispersao[metrica], colunas_dispersao['review_count'], alpha=0.5, s=20, rasterized=True)
+    ax.set(title=titulo, xlabel=titulo, ylabel='Número de Revisões')
     
     # Linha de tendência
-    dados_validos = df[[metrica, 'review_count']].dropna()
-    if len(dados_validos) > 1:
-        z = np.polyfit(dados_validos[metrica], dados_validos['review_count'], 1)
-        p = np.poly1d(z)
-        x_sorted = np.sort(dados_validos[metrica])
-        ax.plot(x_sorted, p(x_sorted), "r--", alpha=0.8, linewidth=2)
+    validos = ~np.isnan(colunas_plot[metrica]) & ~np.isnan(colunas_plot['review_count'])
+    if validos.sum() > 1:
+        # Reta de mínimos quadrados pela forma fechada (cov(x, y) / var(x)), sem polyfit
+        x = colunas_plot[metrica][validos]
+        y = colunas_plot['review_count'][validos]
+        xm, ym = x.mean(), y.mean()
+        inclinacao = ((x - xm) * (y - ym)).sum() / ((x - xm) ** 2).sum()
+        # Uma reta só precisa dos extremos: sem ordenar todos os pontos
+        x_extremos = np.array([x.min(), x.max()])
+        ax.plot(x_extremos, inclinacao * (x_extremos - xm) + ym, "r--", alpha=0.8, linewidth=2)
     
     # Correlação
-    corr, _ = stats.spearmanr(dados_validos[metrica], dados_validos['review_count'])
+    corr = rho_spearman[metrica]
     ax.text(0.05, 0.95, f'ρ = {corr:.3f}', transform=ax.transAxes, 
             fontsize=10, verticalalignment='top', 
             bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.7))
 
-plt.suptitle('RQ05: Relação entre Tamanho dos PRs e Número de Revisões', 
-             fontsize=14, fontweight='bold', y=0.995)
+plt.suptitle('RQ05: Relação entre Tamanho dos PRs e Número de Revisões', y=0.995)
 plt.tight_layout(rect=[0, 0, 1, 0.98])
-graficos_base64['rq05'] = fig_to_base64(fig)
+figuras['rq05'] = fig
 print("✓ Gráfico RQ05 gerado")
 
 # Gráfico RQ06
 fig, ax = plt.subplots(figsize=(10, 6))
-ax.scatter(df['duration_hours'], df['review_count'], alpha=0.5)
+ax.scatter(colunas_dispersao['duration_hours'], colunas_dispersao['review_count'], alpha=0.5, rasterized=True)
 ax.set_xlabel('Duração (horas)', fontsize=11)
 ax.set_ylabel('Número de Revisões', fontsize=11)
 
-dados_validos = df[['duration_hours', 'review_count']].dropna()
-corr, _ = stats.spearmanr(dados_validos['duration_hours'], dados_validos['review_count'])
+corr = rho_spearman['duration_hours']
 ax.text(0.05, 0.95, f'Correlação de Spearman: ρ = {corr:.3f}', 
         transform=ax.transAxes, fontsize=10, verticalalignment='top', 
         bbox=dict(boxstyle='round', facecolor='#f8f9fa', alpha=0.9))
 plt.title('RQ06: Relação entre Tempo de Análise e Número de Revisões', 
-          fontsize=13, fontweight='bold', pad=15)
+          fontsize=13, pad=15)
 plt.tight_layout()
-graficos_base64['rq06'] = fig_to_base64(fig)
+figuras['rq06'] = fig
 print("✓ Gráfico RQ06 gerado")
 
 # Gráfico RQ07
 fig, ax = plt.subplots(figsize=(10, 6))
-ax.scatter(df['description_length'], df['review_count'], alpha=0.5)
+ax.scatter(colunas_dispersao['description_length'], colunas_dispersao['review_count'], alpha=0.5, rasterized=True)
 ax.set_xlabel('Comprimento da Descrição (caracteres)', fontsize=11)
 ax.set_ylabel('Número de Revisões', fontsize=11)
 
-dados_validos = df[['description_length', 'review_count']].dropna()
-corr, _ = stats.spearmanr(dados_validos['description_length'], dados_validos['review_count'])
+corr = rho_spearman['description_length']
 ax.text(0.05, 0.95, f'Correlação de Spearman: ρ = {corr:.3f}', 
         transform=ax.transAxes, fontsize=10, verticalalignment='top', 
         bbox=dict(boxstyle='round', facecolor='#f8f9fa', alpha=0.9))
 plt.title('RQ07: Relação entre Descrição dos PRs e Número de Revisões', 
-          fontsize=13, fontweight='bold', pad=15)
+          fontsize=13, pad=15)
 plt.tight_layout()
-graficos_base64['rq07'] = fig_to_base64(fig)
+figuras['rq07'] = fig
 print("✓ Gráfico RQ07 gerado")
 
 # Gráfico RQ08
@@ -467,28 +518,62 @@ fig, axes = plt.subplots(1, 2, figsize=(14, 6))
 for idx, (metrica, titulo) in enumerate([('participants_count', 'Participantes'), 
                                           ('comments_total', 'Comentários Totais')]):
     ax = axes[idx]
-    ax.scatter(df[metrica], df['review_count'], alpha=0.5)
+    ax.scatter(colunas_dispersao[metrica], colunas_dispersao['review_count'], alpha=0.5, rasterized=True)
     ax.set_xlabel(titulo, fontsize=11)
     ax.set_ylabel('Número de Revisões', fontsize=11)
-    ax.set_title(titulo, fontsize=11, fontweight='bold', pad=10)
+    ax.set_title(titulo)
     
-    dados_validos = df[[metrica, 'review_count']].dropna()
-    corr, _ = stats.spearmanr(dados_validos[metrica], dados_validos['review_count'])
+    corr = rho_spearman[metrica]
     ax.text(0.05, 0.95, f'ρ = {corr:.3f}', transform=ax.transAxes, 
             fontsize=10, verticalalignment='top', 
             bbox=dict(boxstyle='round', facecolor='#f8f9fa', alpha=0.9))
 
-plt.suptitle('RQ08: Relação entre Interações e Número de Revisões', 
-             fontsize=14, fontweight='bold', y=0.995)
+plt.suptitle('RQ08: Relação entre Interações e Número de Revisões', y=0.995)
 plt.tight_layout(rect=[0, 0, 1, 0.98])
-graficos_base64['rq08'] = fig_to_base64(fig)
+figuras['rq08'] = fig
 print("✓ Gráfico RQ08 gerado")
 
+# Codificação PNG em paralelo: a compressão zlib roda em C e libera o GIL
+os.makedirs(GRAFICOS_DIR, exist_ok=True)
+with ThreadPoolExecutor(max_workers=4) as executor:
+    graficos = dict(zip(figuras, executor.map(fig_to_file, figuras.values(),
+                                              [f'grafico_{rq}' for rq in figuras])))
+for fig in figuras.values():
+    plt.close(fig)
+print("✓ Gráficos salvos em", GRAFICOS_DIR)
+
 # ==========================================
 # 5. GERAÇÃO DO HTML (SEGUINDO O PADRÃO)
 # ==========================================
 
-html_content = f"""
+def linha_mann_whitney(r):
+    """Linha da tabela de resultados do teste de Mann-Whitney (RQ01 e RQ04)"""
+    status_class = 'table-success' if r['significativo'] else 'table-warning'
+    status_text = '✓ Sim' if r['significativo'] else '✗ Não'
+    return f"""
+            <tr class="{status_class}">
+                <td><code>{r['metrica']}</code></td>
+                <td>{r['mediana_merged']:.2f}</td>
+                <td>{r['mediana_closed']:.2f}</td>
+                <td>{r['p_valor']:.4f}</td>
+                <td>{status_text}</td>
+            </tr>
+"""
+
+def linha_spearman(r):
+    """Linha da tabela de correlações de Spearman (RQ05 e RQ08)"""
+    return f"""
+            <tr>
+                <td><code>{r['metrica']}</code></td>
+                <td>{r['spearman']:.4f}</td>
+                <td>{r['p_spearman']:.4f}</td>
+                <td><span class="badge badge-info">{r['interpretacao'].capitalize()}</span></td>
+            </tr>
+"""
+
+# O HTML é montado em partes e unido uma única vez no final (sem recopiar o texto
+# acumulado a cada linha de tabela)
+partes_html = [f"""
 <!DOCTYPE html>
 <html lang="pt-br">
 <head>
@@ -619,26 +704,13 @@ html_content = f"""
                 <th>p-valor</th>
                 <th>Significativo?</th>
             </tr>
-"""
-
-for r in rq01_resultados:
-    status_class = 'table-success' if r['significativo'] else 'table-warning'
-    status_text = '✓ Sim' if r['significativo'] else '✗ Não'
-    html_content += f"""
-            <tr class="{status_class}">
-                <td><code>{r['metrica']}</code></td>
-                <td>{r['mediana_merged']:.2f}</td>
-                <td>{r['mediana_closed']:.2f}</td>
-                <td>{r['p_valor']:.4f}</td>
-                <td>{status_text}</td>
-            </tr>
-"""
-
-html_content += f"""
+"""]
+partes_html.append(''.join(linha_mann_whitney(r) for r in rq01_resultados))
+partes_html.append(f"""
         </table>
         
         <div class="grafico">
-            <img src="{graficos_base64['rq01']}" class="img-fluid" alt="Gráfico para RQ01">
+            <img src="{graficos['rq01']}" class="img-fluid" alt="Gráfico para RQ01">
         </div>
     </div>
     
@@ -652,7 +724,7 @@ html_content += f"""
         <p><b>Discussão:</b> {'O tempo de análise apresenta diferença significativa entre PRs aceitos e rejeitados.' if rq02_resultado['significativo'] else 'O tempo de análise não apresenta diferença significativa.'}</p>
         
         <div class="grafico">
-            <img src="{graficos_base64['rq02']}" class="img-fluid" alt="Gráfico para RQ02">
+            <img src="{graficos['rq02']}" class="img-fluid" alt="Gráfico para RQ02">
         </div>
     </div>
     
@@ -665,7 +737,7 @@ html_content += f"""
         {'<span class="badge badge-success">Significativo</span>' if rq03_resultado['significativo'] else '<span class="badge badge-warning">Não significativo</span>'}</p>
         
         <div class="grafico">
-            <img src="{graficos_base64['rq03']}" class="img-fluid" alt="Gráfico para RQ03">
+            <img src="{graficos['rq03']}" class="img-fluid" alt="Gráfico para RQ03">
         </div>
     </div>
     
@@ -680,26 +752,13 @@ html_content += f"""
                 <th>p-valor</th>
                 <th>Significativo?</th>
             </tr>
-"""
-
-for r in rq04_resultados:
-    status_class = 'table-success' if r['significativo'] else 'table-warning'
-    status_text = '✓ Sim' if r['significativo'] else '✗ Não'
-    html_content += f"""
-            <tr class="{status_class}">
-                <td><code>{r['metrica']}</code></td>
-                <td>{r['mediana_merged']:.2f}</td>
-                <td>{r['mediana_closed']:.2f}</td>
-                <td>{r['p_valor']:.4f}</td>
-                <td>{status_text}</td>
-            </tr>
-"""
-
-html_content += f"""
+""")
+partes_html.append(''.join(linha_mann_whitney(r) for r in rq04_resultados))
+partes_html.append(f"""
         </table>
         
         <div class="grafico">
-            <img src="{graficos_base64['rq04']}" class="img-fluid" alt="Gráfico para RQ04">
+            <img src="{graficos['rq04']}" class="img-fluid" alt="Gráfico para RQ04">
         </div>
     </div>
     
@@ -713,23 +772,13 @@ html_content += f"""
                 <th>p-valor</th>
                 <th>Interpretação</th>
             </tr>
-"""
-
-for r in rq05_resultados:
-    html_content += f"""
-            <tr>
-                <td><code>{r['metrica']}</code></td>
-                <td>{r['spearman']:.4f}</td>
-                <td>{r['p_spearman']:.4f}</td>
-                <td><span class="badge badge-info">{r['interpretacao'].capitalize()}</span></td>
-            </tr>
-"""
-
-html_content += f"""
+""")
+partes_html.append(''.join(linha_spearman(r) for r in rq05_resultados))
+partes_html.append(f"""
         </table>
         
         <div class="grafico">
-            <img src="{graficos_base64['rq05']}" class="img-fluid" alt="Gráfico para RQ05">
+            <img src="{graficos['rq05']}" class="img-fluid" alt="Gráfico para RQ05">
         </div>
     </div>
     
@@ -740,7 +789,7 @@ html_content += f"""
         <p><b>Interpretação:</b> <span class="badge badge-info">{rq06_resultado['interpretacao'].capitalize()}</span></p>
         
         <div class="grafico">
-            <img src="{graficos_base64['rq06']}" class="img-fluid" alt="Gráfico para RQ06">
+            <img src="{graficos['rq06']}" class="img-fluid" alt="Gráfico para RQ06">
         </div>
     </div>
     
@@ -751,7 +800,7 @@ html_content += f"""
         <p><b>Interpretação:</b> <span class="badge badge-info">{rq07_resultado['interpretacao'].capitalize()}</span></p>
         
         <div class="grafico">
-            <img src="{graficos_base64['rq07']}" class="img-fluid" alt="Gráfico para RQ07">
+            <img src="{graficos['rq07']}" class="img-fluid" alt="Gráfico para RQ07">
         </div>
     </div>
     
@@ -765,23 +814,13 @@ html_content += f"""
                 <th>p-valor</th>
                 <th>Interpretação</th>
             </tr>
-"""
-
-for r in rq08_resultados:
-    html_content += f"""
-            <tr>
-                <td><code>{r['metrica']}</code></td>
-                <td>{r['spearman']:.4f}</td>
-                <td>{r['p_spearman']:.4f}</td>
-                <td><span class="badge badge-info">{r['interpretacao'].capitalize()}</span></td>
-            </tr>
-"""
-
-html_content += f"""
+""")
+partes_html.append(''.join(linha_spearman(r) for r in rq08_resultados))
+partes_html.append(f"""
         </table>
         
         <div class="grafico">
-            <img src="{graficos_base64['rq08']}" class="img-fluid" alt="Gráfico para RQ08">
+            <img src="{graficos['rq08']}" class="img-fluid" alt="Gráfico para RQ08">
         </div>
     </div>
     
@@ -812,7 +851,8 @@ html_content += f"""
 </div>
 </body>
 </html>
-"""
+""")
+html_content = ''.join(partes_html)
 
 # Salvar HTML
 with open('relatorio_lab03.html', 'w', encoding='utf-8') as f:
@@ -824,16 +864,18 @@ print("\n✓ Relatório HTML gerado: relatorio_lab03.html")
 # 6. EXPORTAR RESUMO CSV
 # ==========================================
 
+# Todas as estatísticas já foram calculadas na análise descritiva
 resumo = pd.DataFrame({
     'Métrica': metricas,
-    'Mediana_Geral': [df[m].median() for m in metricas],
-    'Mediana_MERGED': [df[df['state'] == 'MERGED'][m].median() for m in metricas],
-    'Mediana_CLOSED': [df[df['state'] == 'CLOSED'][m].median() for m in metricas],
-    'Media_Geral': [df[m].mean() for m in metricas],
-    'Desvio_Padrao': [df[m].std() for m in metricas]
+    'Mediana_Geral': estatisticas_gerais.loc['median'].to_numpy(),
+    'Mediana_MERGED': medianas_por_status.loc['MERGED', metricas].to_numpy(),
+    'Mediana_CLOSED': medianas_por_status.loc['CLOSED', metricas].to_numpy(),
+    'Media_Geral': estatisticas_gerais.loc['mean'].to_numpy(),
+    'Desvio_Padrao': estatisticas_gerais.loc['std'].to_numpy()
 })
 
-resumo.to_csv('resumo_estatistico.csv', index=False)
+# Terminador fixo: o arquivo sai igual em qualquer sistema operacional
+resumo.to_csv('resumo_estatistico.csv', index=False, lineterminator='\n')
 print("✓ Resumo estatístico salvo: resumo_estatistico.csv")
 
 print("\n" + "=" * 80)
@@ -841,5 +883,6 @@ print("ANÁLISE CONCLUÍDA COM SUCESSO!")
 print("=" * 80)
 print("\nArquivos gerados:")
 print("  - relatorio_lab03.html (RELATÓRIO COMPLETO)")
+print(f"  - {GRAFICOS_DIR}/ (gráficos referenciados pelo relatório)")
 print("  - resumo_estatistico.csv")
 print("\n" + "=" * 80)
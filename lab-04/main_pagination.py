@@ -17,7 +17,7 @@ COM SUPORTE A PAGINAÇÃO PARA MÚLTIPLOS REPOSITÓRIOS
 
 import os
 
-import json
+import orjson
 
 import csv
 
@@ -31,18 +31,32 @@ import stat
 
 from pathlib import Path
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 
 import requests
 
+from requests.adapters import HTTPAdapter
+
+from urllib3.util.retry import Retry
+
+import pandas as pd
+
 from datetime import datetime
 
 import zipfile
 
-import io
-
 import time
 
+import re
+
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from collections import deque
+
+# Linha "CHAVE=valor" do .env (espacos ao redor da chave e do valor sao ignorados;
+# [^\S\n] nao atravessa a quebra de linha, entao um valor vazio nao engole a linha seguinte)
+ENV_LINE_PATTERN = re.compile(r"^[^\S\n]*([A-Za-z_]\w*)[^\S\n]*=[^\S\n]*(.*?)[^\S\n]*$", re.MULTILINE)
+
 # Funcao para carregar variavel do .env
 def load_env():
 
@@ -62,27 +76,14 @@ def load_env():
 
         if env_path and env_path.exists():
 
-            with open(env_path, "r", encoding="utf-8") as f:
-
-                for line in f:
-
-                    line = line.strip()
-
-                    # Ignora linhas vazias e comentarios
-
-                    if line and not line.startswith("#"):
-
-                        # Separa chave=valor
+            # Um unico regex sobre o arquivo inteiro extrai os pares chave=valor
+            # (linhas vazias e comentarios nao casam com o padrao)
 
-                        if "=" in line:
+            pares = ENV_LINE_PATTERN.findall(env_path.read_text(encoding="utf-8"))
 
-                            key, value = line.split("=", 1)
+            # Remove aspas se existirem
 
-                            # Remove aspas se existirem
-
-                            value = value.strip().strip('"').strip("'")
-
-                            os.environ[key.strip()] = value
+            os.environ.update({key: value.strip('"').strip("'") for key, value in pares})
 
             break
 
@@ -102,6 +103,16 @@ OUTPUT_CSV = "analise_repositorios_java.csv"
 
 TEMP_DIR = "temp_repos"
 
+# Cache em disco das contagens de bugs (reexecucoes nao gastam a cota da API de busca)
+CACHE_DIR = ".cache_github"
+CACHE_TTL_SECONDS = 24 * 60 * 60
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024        # Bytes lidos por iteracao nos downloads (1 MB)
+ZIP_SPOOL_MAX_SIZE = 32 * 1024 * 1024    # Acima disso o ZIP baixado vai para disco em vez de ficar em memoria
+
+# Clone raso so do branch padrao: sem tags, sem outros branches e com blobs buscados sob demanda no checkout
+GIT_CLONE_COMMAND = ["git", "clone", "--depth", "1", "--single-branch", "--no-tags", "--filter=blob:none"]
+
 # ============================================================================
 # VARIAVEIS DE FILTRO - BASEADAS NO ARTIGO ACADEMIC
 # ============================================================================
@@ -115,6 +126,11 @@ MIN_LOC = 2000               # Mínimo de linhas de código (baseado no artigo)
 # ============================================================================
 REPOS_PER_PAGE = 100         # Máximo permitido pela API (não alterar)
 MAX_PAGES = 20               # Máximo de páginas a buscar (100 * 20 = 2000 repos para filtro)
+SEARCH_PAGES_IN_FLIGHT = 4   # Páginas da busca requisitadas em paralelo (à frente da que está sendo filtrada)
+
+LOC_WORKERS = min(32, (os.cpu_count() or 4) * 4)  # Threads de leitura dos .java na contagem de LOC
+
+ANALYSIS_WORKERS = 4         # Repositorios analisados em paralelo (um processo por repositorio: clone + CK)
 
 # ============================================================================
 
@@ -172,49 +188,160 @@ def safe_rmtree(path):
 
         print(f"[!] Erro ao remover {path}: {e}")
 
-def count_total_loc(repo_path: str) -> int:
+# Linha vazia ou que comeca com //, * ou /* (apos espacos), no texto do arquivo .java
+# (\s em str cobre os mesmos espacos Unicode que str.strip(), como o NBSP; \n fica de fora)
+NON_CODE_LINE_PATTERN = re.compile(r"^[^\S\n]*(?://|\*|/\*|$)", re.MULTILINE)
+
+def iter_java_files(root: str):
 
     """
-    Conta o total de linhas de código (LOC) no repositorio
-    Ignora comentários e linhas vazias (somente código fonte real)
+    Percorre o repositorio com os.scandir e gera o caminho de cada arquivo .java
+    Usa o tipo ja em cache no DirEntry (sem stat extra por arquivo) e ignora links simbolicos
     """
 
+    stack = [root]
+
+    while stack:
+
+        current = stack.pop()
+
+        try:
+
+            entries = os.scandir(current)
+
+        except OSError:
+
+            continue
+
+        with entries:
+
+            for entry in entries:
+
+                if entry.is_symlink():
+
+                    continue
+
+                if entry.is_dir(follow_symlinks=False):
+
+                    stack.append(entry.path)
+
+                elif entry.name.endswith(".java") and entry.is_file(follow_symlinks=False):
+
+                    yield entry.path
+
+# Colunas numericas dos CSVs do CK usadas nas metricas
+CK_CLASS_COLUMNS = ["cbo", "wmc", "rfc", "lcom", "tcc", "dit", "noc", "loc"]
+
+CK_METHOD_COLUMNS = ["wmc", "loc", "loopQty", "comparisonsQty"]
+
+def read_ck_csv(path: str, columns: List[str]) -> pd.DataFrame:
+
+    """
+    Le apenas as colunas numericas indicadas de um CSV do CK (parsing em C pelo pandas)
+    Colunas ausentes no arquivo viram colunas vazias (tratadas como 0 por quem chama)
+    """
+
+    data = pd.read_csv(
+
+        path,
+
+        usecols=lambda column: column in columns,
+
+        encoding_errors="ignore",
+
+    )
+
+    return data.reindex(columns=columns).apply(pd.to_numeric, errors="coerce")
+
+def count_file_loc(java_file: str) -> int:
+
+    """Conta as linhas de codigo de um arquivo .java (0 se nao puder ser lido)"""
+
     try:
 
-        total_loc = 0
+        with open(java_file, "rb") as f:
 
-        java_files = list(Path(repo_path).rglob("*.java"))
+            content = f.read()
 
-        for java_file in java_files:
+    except OSError:
 
-            try:
+        return 0
 
-                with open(java_file, "r", encoding="utf-8", errors="ignore") as f:
+    # Mesma leitura do contador linha a linha: UTF-8 descartando bytes invalidos e
+    # \r\n ou \r sozinho tratados como quebra de linha (universal newlines)
 
-                    for line in f:
+    text = content.decode("utf-8", errors="ignore")
 
-                        # Remove espaços e tabs do início
-                        stripped = line.strip()
+    if "\r" in text:
 
-                        # Ignora linhas vazias e comentários
-                        if stripped and not stripped.startswith("//") and not stripped.startswith("*"):
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
 
-                            # Ignora blocos de comentário /* */
-                            if not stripped.startswith("/*"):
+    # Linhas do arquivo (o trecho apos o ultimo \n conta como uma linha, vazia ou nao)
+    # menos as linhas vazias ou de comentario, contadas pelo regex em C sobre o arquivo todo
 
-                                total_loc += 1
+    return text.count("\n") + 1 - len(NON_CODE_LINE_PATTERN.findall(text))
 
-            except Exception as e:
+def scan_java(repo_path: str) -> Tuple[int, int]:
+
+    """
+    Percorre o repositorio uma unica vez e retorna (arquivos .java, total de LOC)
+    Ignora comentários e linhas vazias (somente código fonte real)
+    """
+
+    try:
+
+        # Cada arquivo e enviado para leitura assim que o scandir o encontra,
+        # entao a listagem dos diretorios e as leituras acontecem ao mesmo tempo
+
+        with ThreadPoolExecutor(max_workers=LOC_WORKERS) as executor:
 
-                pass
+            file_locs = list(executor.map(count_file_loc, iter_java_files(repo_path)))
 
-        return total_loc
+        return len(file_locs), sum(file_locs)
 
     except Exception as e:
 
         print(f"[!] Erro ao contar LOC: {e}")
 
-        return 0
+        return 0, 0
+
+def bug_count_cache_path(owner: str, repo: str) -> str:
+
+    """Caminho do arquivo de cache da contagem de bugs do repositorio"""
+
+    return os.path.join(CACHE_DIR, f"bugs_{owner}_{repo}.json")
+
+def load_cached(path: str):
+
+    """Retorna o valor em cache se existir e ainda estiver dentro do TTL"""
+
+    try:
+
+        if time.time() - os.path.getmtime(path) > CACHE_TTL_SECONDS:
+
+            return None
+
+        with open(path, "rb") as f:
+
+            return orjson.loads(f.read())
+
+    except (OSError, ValueError):
+
+        return None
+
+def save_cached(path: str, value):
+
+    """Grava o valor no cache (arquivo temporario + rename, seguro entre os processos do pool)"""
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+
+    with open(tmp_path, "wb") as f:
+
+        f.write(orjson.dumps(value))
+
+    os.replace(tmp_path, path)
 
 class GitHubAnalyzer:
 
@@ -236,6 +363,24 @@ class GitHubAnalyzer:
 
         self.session.headers.update(self.headers)
 
+        # Pool de conexoes reaproveitado por busca, downloads e threads de prefetch, com backoff em 429/5xx
+
+        retry = Retry(
+
+            total=3,
+
+            backoff_factor=0.5,
+
+            status_forcelist=[429, 502, 503, 504],
+
+            raise_on_status=False,
+
+        )
+
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=retry)
+
+        self.session.mount("https://", adapter)
+
     def get_rate_limit_info(self) -> Dict[str, int]:
 
         """NOVO: Obtém informação sobre rate limit da API"""
@@ -246,7 +391,7 @@ class GitHubAnalyzer:
 
             response = self.session.get(url)
 
-            data = response.json()
+            data = orjson.loads(response.content)
 
             return {
 
@@ -264,6 +409,37 @@ class GitHubAnalyzer:
 
             return {"limit": 0, "remaining": 0, "reset": 0}
 
+    def rate_limit_from_headers(self, response: requests.Response) -> Dict[str, int]:
+
+        """Lê o rate limit dos headers X-RateLimit-* da própria resposta (sem requisição extra)"""
+
+        return {
+
+            "limit": int(response.headers.get("X-RateLimit-Limit", 0)),
+
+            "remaining": int(response.headers.get("X-RateLimit-Remaining", 0)),
+
+            "reset": int(response.headers.get("X-RateLimit-Reset", 0)),
+
+        }
+
+    def fetch_search_page(self, page: int) -> requests.Response:
+
+        """Requisita uma página da busca de repositorios Java"""
+
+        url = f"{GITHUB_API_URL}/search/repositories"
+
+        params = {
+            # Spring Boot: topic e termos no readme/description; ainda em Java e ordenado por stars
+            "q": 'language:java stars:>10 (topic:spring-boot OR "spring-boot" in:readme,description)',
+            "sort": "stars",
+            "order": "desc",
+            "per_page": REPOS_PER_PAGE,
+            "page": page,
+        }
+
+        return self.session.get(url, params=params)
+
     def get_top_java_repos_paginated(self, max_repos: int = 500) -> List[Dict[str, Any]]:
 
         """
@@ -311,6 +487,10 @@ class GitHubAnalyzer:
 
         ]
 
+        # Uma unica alternancia compilada: cada repositorio e varrido uma vez, nao uma vez por palavra
+
+        avoid_pattern = re.compile("|".join(re.escape(keyword) for keyword in keywords_to_avoid))
+
         all_repos = []
 
         page = 1
@@ -323,111 +503,111 @@ class GitHubAnalyzer:
 
         print(f"    - Máximo de páginas: {MAX_PAGES}")
 
-        while len(all_repos) < max_repos and page <= MAX_PAGES:
+        # As próximas páginas já são requisitadas enquanto a atual é filtrada; o
+        # processamento continua em ordem, página a página
 
-            print(f"\n[*] Buscando página {page}...")
+        with ThreadPoolExecutor(max_workers=SEARCH_PAGES_IN_FLIGHT) as executor:
 
-            url = f"{GITHUB_API_URL}/search/repositories"
+            pending_pages = deque()
 
-            params = {
-                # Spring Boot: topic e termos no readme/description; ainda em Java e ordenado por stars
-                "q": 'language:java stars:>10 (topic:spring-boot OR "spring-boot" in:readme,description)',
-                "sort": "stars",
-                "order": "desc",
-                "per_page": REPOS_PER_PAGE,
-                "page": page,
-            }
+            next_page = 1
 
-            try:
+            while len(all_repos) < max_repos and page <= MAX_PAGES:
 
-                response = self.session.get(url, params=params)
+                while next_page <= MAX_PAGES and len(pending_pages) < SEARCH_PAGES_IN_FLIGHT:
 
-                response.raise_for_status()
+                    pending_pages.append(executor.submit(self.fetch_search_page, next_page))
 
-                data = response.json()
+                    next_page += 1
 
-                page_repos = data.get("items", [])
+                print(f"\n[*] Buscando página {page}...")
 
-                if not page_repos:
+                try:
 
-                    print(f"[!] Página {page} retornou vazia. Encerrando busca.")
+                    response = pending_pages.popleft().result()
 
-                    break
+                    response.raise_for_status()
 
-                print(f"   [+] Encontrados {len(page_repos)} repositorios nesta página")
+                    data = orjson.loads(response.content)
 
-                # Filtra repositorios que provavelmente sao projetos de codigo real
+                    page_repos = data.get("items", [])
 
-                for repo in page_repos:
+                    if not page_repos:
 
-                    if len(all_repos) >= max_repos:
+                        print(f"[!] Página {page} retornou vazia. Encerrando busca.")
 
                         break
 
-                    repo_name_lower = repo["name"].lower()
+                    print(f"   [+] Encontrados {len(page_repos)} repositorios nesta página")
 
-                    repo_desc_lower = (repo["description"] or "").lower()
+                    # Filtra repositorios que provavelmente sao projetos de codigo real
 
-                    repo_full_name_lower = repo["full_name"].lower()
+                    for repo in page_repos:
 
-                    # Verifica se nao contem palavras-chave de tutorial
+                        if len(all_repos) >= max_repos:
 
-                    is_tutorial = any(
+                            break
 
-                        keyword in repo_name_lower
+                        searchable_text = f"{repo['name']}\n{repo['full_name']}\n{repo['description'] or ''}".lower()
 
-                        or keyword in repo_desc_lower
+                        # Verifica se nao contem palavras-chave de tutorial
 
-                        or keyword in repo_full_name_lower
+                        is_tutorial = avoid_pattern.search(searchable_text) is not None
 
-                        for keyword in keywords_to_avoid
+                        if not is_tutorial:
 
-                    )
+                            all_repos.append(repo)
 
-                    if not is_tutorial:
+                            total_candidates_found += 1
 
-                        all_repos.append(repo)
+                    print(f"   [+] Total após filtro: {len(all_repos)} repositorios")
 
-                        total_candidates_found += 1
+                    # NOVO: Exibe info de rate limit (da cota de busca, informada na resposta da página)
+                    rate_limit = self.rate_limit_from_headers(response)
 
-                print(f"   [+] Total após filtro: {len(all_repos)} repositorios")
+                    if rate_limit["remaining"] > 0:
 
-                # NOVO: Exibe info de rate limit
-                rate_limit = self.get_rate_limit_info()
+                        print(f"   [*] Rate limit: {rate_limit['remaining']}/{rate_limit['limit']} requisições restantes")
 
-                if rate_limit["remaining"] > 0:
+                        if rate_limit["remaining"] < 5:
 
-                    print(f"   [*] Rate limit: {rate_limit['remaining']}/{rate_limit['limit']} requisições restantes")
+                            print(f"   [!] AVISO: Menos de 5 requisições restantes!")
 
-                    if rate_limit["remaining"] < 5:
+                            print(f"   [!] Reset em: {datetime.fromtimestamp(rate_limit['reset']).strftime('%H:%M:%S')}")
 
-                        print(f"   [!] AVISO: Menos de 5 requisições restantes!")
+                            break
 
-                        print(f"   [!] Reset em: {datetime.fromtimestamp(rate_limit['reset']).strftime('%H:%M:%S')}")
+                    page += 1
 
-                        break
+                except requests.exceptions.HTTPError as e:
+
+                    print(f"   [!] Erro HTTP na página {page}: {e}")
 
-                page += 1
+                    if e.response.status_code == 422:
 
-            except requests.exceptions.HTTPError as e:
+                        print(f"   [!] Validação falhou. Parâmetros de busca inválidos.")
 
-                print(f"   [!] Erro HTTP na página {page}: {e}")
+                        break
 
-                if e.response.status_code == 422:
+                    # A mesma página é requisitada de novo na próxima volta
 
-                    print(f"   [!] Validação falhou. Parâmetros de busca inválidos.")
+                    pending_pages.appendleft(executor.submit(self.fetch_search_page, page))
 
-                    break
+                except Exception as e:
 
-            except Exception as e:
+                    print(f"   [!] Erro ao buscar página {page}: {e}")
 
-                print(f"   [!] Erro ao buscar página {page}: {e}")
+                    import traceback
 
-                import traceback
+                    traceback.print_exc()
 
-                traceback.print_exc()
+                    break
 
-                break
+            # Descarta as páginas adiantadas que não serão mais usadas
+
+            for future in pending_pages:
+
+                future.cancel()
 
         print(f"\n{'='*70}")
 
@@ -457,9 +637,7 @@ class GitHubAnalyzer:
 
         try:
 
-            java_files = list(Path(repo_path).rglob("*.java"))
-
-            return len(java_files)
+            return sum(1 for _ in iter_java_files(repo_path))
 
         except Exception as e:
 
@@ -471,6 +649,14 @@ class GitHubAnalyzer:
 
         """Conta o numero de issues marcadas como bug"""
 
+        cache_path = bug_count_cache_path(owner, repo)
+
+        cached = load_cached(cache_path)
+
+        if cached is not None:
+
+            return cached["total_count"]
+
         url = f"{GITHUB_API_URL}/search/issues"
 
         params = {"q": f"repo:{owner}/{repo} type:issue label:bug", "per_page": 1}
@@ -481,7 +667,9 @@ class GitHubAnalyzer:
 
             response.raise_for_status()
 
-            total_count = response.json()["total_count"]
+            total_count = orjson.loads(response.content)["total_count"]
+
+            save_cached(cache_path, {"total_count": total_count})
 
             return total_count
 
@@ -505,13 +693,13 @@ class GitHubAnalyzer:
 
         try:
 
-            response = requests.get(CK_JAR_URL, stream=True)
+            response = self.session.get(CK_JAR_URL, stream=True)
 
             response.raise_for_status()
 
             with open(target_path, "wb") as f:
 
-                for chunk in response.iter_content(chunk_size=8192):
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
 
                     f.write(chunk)
 
@@ -550,7 +738,7 @@ class GitHubAnalyzer:
 
                     if response.status_code == 200:
 
-                        default_branch = response.json().get("default_branch", "main")
+                        default_branch = orjson.loads(response.content).get("default_branch", "main")
 
                         zip_url = f"https://github.com/{owner}/{repo}/archive/refs/heads/{default_branch}.zip"
 
@@ -564,59 +752,70 @@ class GitHubAnalyzer:
 
                 print(f"   [*] Tentando baixar ZIP do branch '{branch}'...")
 
-                response = requests.get(zip_url, stream=True, timeout=300)
+                response = self.session.get(zip_url, stream=True, timeout=300)
 
                 if response.status_code == 200:
 
                     print(f"   [*] Download do ZIP iniciado...")
 
-                    zip_data = io.BytesIO()
+                    # Garante que o diretorio pai existe
 
-                    total_size = 0
+                    parent_dir = os.path.dirname(target_dir)
 
-                    for chunk in response.iter_content(chunk_size=8192):
+                    os.makedirs(parent_dir, exist_ok=True)
 
-                        if chunk:
+                    # Repositorios grandes passam do limite e vao para um arquivo temporario em disco
 
-                            zip_data.write(chunk)
+                    with tempfile.SpooledTemporaryFile(max_size=ZIP_SPOOL_MAX_SIZE) as zip_data:
 
-                            total_size += len(chunk)
+                        total_size = 0
 
-                    print(f"   [*] ZIP baixado ({total_size / 1024 / 1024:.2f} MB). Extraindo...")
+                        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
 
-                    # Garante que o diretorio pai existe
+                            if chunk:
 
-                    parent_dir = os.path.dirname(target_dir)
+                                zip_data.write(chunk)
 
-                    os.makedirs(parent_dir, exist_ok=True)
+                                total_size += len(chunk)
 
-                    # Extrai o ZIP
+                        print(f"   [*] ZIP baixado ({total_size / 1024 / 1024:.2f} MB). Extraindo...")
 
-                    with zipfile.ZipFile(zip_data) as zip_ref:
+                        zip_data.seek(0)
 
-                        zip_ref.extractall(parent_dir)
+                        # Extrai o ZIP em uma pasta temporaria exclusiva: outros processos do pool
+                        # extraem em paralelo no mesmo TEMP_DIR
 
-                    # O ZIP extrai para uma pasta com nome repo-branch
+                        extract_dir = tempfile.mkdtemp(prefix="zip_", dir=parent_dir)
 
-                    # Precisamos renomear para target_dir
+                        try:
+
+                            with zipfile.ZipFile(zip_data) as zip_ref:
+
+                                zip_ref.extractall(extract_dir)
 
-                    extracted_dirs = [
+                        except Exception:
 
-                        d for d in Path(parent_dir).iterdir()
+                            safe_rmtree(extract_dir)
 
-                        if d.is_dir() and d.name.startswith(f"{repo}-")
+                            raise
+
+                    # O ZIP extrai para uma unica pasta com nome repo-branch
+
+                    # Precisamos renomear para target_dir
 
-                    ]
+                    with os.scandir(extract_dir) as entries:
 
-                    if extracted_dirs:
+                        extracted_dirs = [entry.path for entry in entries if entry.is_dir(follow_symlinks=False)]
 
-                        extracted_path = extracted_dirs[0]
+                    if len(extracted_dirs) == 1:
 
                         if os.path.exists(target_dir):
 
                             safe_rmtree(target_dir)
 
-                        os.rename(str(extracted_path), target_dir)
+                        os.rename(extracted_dirs[0], target_dir)
+
+                        safe_rmtree(extract_dir)
 
                         print(f"   [+] Repositorio baixado e extraido com sucesso (ZIP)")
 
@@ -624,6 +823,8 @@ class GitHubAnalyzer:
 
                     else:
 
+                        safe_rmtree(extract_dir)
+
                         print(f"   [!] Nao foi possivel encontrar pasta extraida")
 
                 elif response.status_code == 404:
@@ -691,7 +892,7 @@ class GitHubAnalyzer:
 
             result = subprocess.run(
 
-                ["git", "clone", "--depth", "1", repo_url, target_dir],
+                [*GIT_CLONE_COMMAND, repo_url, target_dir],
 
                 capture_output=True,
 
@@ -731,7 +932,7 @@ class GitHubAnalyzer:
 
             result = subprocess.run(
 
-                ["git", "clone", "--depth", "1", repo_url, target_dir],
+                [*GIT_CLONE_COMMAND, repo_url, target_dir],
 
                 capture_output=True,
 
@@ -973,76 +1174,40 @@ class GitHubAnalyzer:
 
         try:
 
-            # Analise de classes
+            # Analise de classes (leitura vetorizada: so as colunas numericas usadas)
 
             if class_csv and os.path.exists(class_csv):
 
                 print(f"   [*] Lendo class.csv: {class_csv}")
 
-                with open(class_csv, "r", encoding="utf-8", errors="ignore") as f:
-
-                    reader = csv.DictReader(f)
-
-                    total_cbo = 0
-
-                    total_wmc = 0
-
-                    total_rfc = 0
-
-                    total_lcom = 0
-
-                    total_tcc = 0
-
-                    total_dit = 0.0
-                    total_noc = 0.0
-
-                    for row in reader:
-
-                        metrics["total_classes"] += 1
-
-                        total_cbo += float(row.get("cbo", 0) or 0)
+                classes = read_ck_csv(class_csv, CK_CLASS_COLUMNS)
 
-                        wmc = float(row.get("wmc", 0) or 0)
+                metrics["total_classes"] = len(classes)
 
-                        total_wmc += wmc
+                if metrics["total_classes"] > 0:
 
-                        total_rfc += float(row.get("rfc", 0) or 0)
+                    # Valores vazios contam como 0, exceto o tcc (NaN quando nao se aplica), que e ignorado
 
-                        total_lcom += float(row.get("lcom", 0) or 0)
+                    filled = classes.fillna(0)
 
-                        total_dit += float(row.get("dit", 0) or 0)
-                        total_noc += float(row.get("noc", 0) or 0)
+                    metrics["total_loc"] = int(filled["loc"].sum())
 
-                        tcc_val = row.get("tcc", "")
+                    total_tcc = float(classes["tcc"].sum())
 
-                        if tcc_val and tcc_val != "NaN" and tcc_val != "":
+                    n = metrics["total_classes"]
 
-                            try:
+                    metrics["avg_cbo"] = float(filled["cbo"].sum()) / n
 
-                                total_tcc += float(tcc_val)
+                    metrics["avg_wmc"] = float(filled["wmc"].sum()) / n
 
-                            except:
+                    metrics["avg_rfc"] = float(filled["rfc"].sum()) / n
 
-                                pass
+                    metrics["avg_lcom"] = float(filled["lcom"].sum()) / n
 
-                        metrics["total_loc"] += int(row.get("loc", 0) or 0)
+                    metrics["avg_tcc"] = total_tcc / n if total_tcc > 0 else 0
 
-                    if metrics["total_classes"] > 0:
-
-                        n = metrics["total_classes"]
-
-                        metrics["avg_cbo"] = total_cbo / n
-
-                        metrics["avg_wmc"] = total_wmc / n
-
-                        metrics["avg_rfc"] = total_rfc / n
-
-                        metrics["avg_lcom"] = total_lcom / n
-
-                        metrics["avg_tcc"] = total_tcc / n if total_tcc > 0 else 0
-
-                        metrics["avg_dit"] = total_dit / n
-                        metrics["avg_noc"] = total_noc / n
+                    metrics["avg_dit"] = float(filled["dit"].sum()) / n
+                    metrics["avg_noc"] = float(filled["noc"].sum()) / n
 
             # Analise de metodos
 
@@ -1050,45 +1215,21 @@ class GitHubAnalyzer:
 
                 print(f"   [*] Lendo method.csv: {method_csv}")
 
-                with open(method_csv, "r", encoding="utf-8", errors="ignore") as f:
-
-                    reader = csv.DictReader(f)
-
-                    total_wmc = 0
-
-                    total_loc = 0
-
-                    total_loops = 0
-
-                    total_comparisons = 0
-
-                    for row in reader:
+                methods = read_ck_csv(method_csv, CK_METHOD_COLUMNS).fillna(0)
 
-                        metrics["total_methods"] += 1
+                metrics["total_methods"] = len(methods)
 
-                        wmc = float(row.get("wmc", 0) or 0)
+                if metrics["total_methods"] > 0:
 
-                        total_wmc += wmc
+                    n = metrics["total_methods"]
 
-                        loc = int(row.get("loc", 0) or 0)
+                    metrics["avg_wmc_method"] = float(methods["wmc"].sum()) / n
 
-                        total_loc += loc
+                    metrics["avg_loc_method"] = float(methods["loc"].sum()) / n
 
-                        total_loops += int(row.get("loopQty", 0) or 0)
+                    metrics["avg_loops"] = float(methods["loopQty"].sum()) / n
 
-                        total_comparisons += int(row.get("comparisonsQty", 0) or 0)
-
-                    if metrics["total_methods"] > 0:
-
-                        n = metrics["total_methods"]
-
-                        metrics["avg_wmc_method"] = total_wmc / n
-
-                        metrics["avg_loc_method"] = total_loc / n
-
-                        metrics["avg_loops"] = total_loops / n
-
-                        metrics["avg_comparisons"] = total_comparisons / n
+                    metrics["avg_comparisons"] = float(methods["comparisonsQty"].sum()) / n
 
             print(
 
@@ -1148,21 +1289,13 @@ class GitHubAnalyzer:
 
             dup = duplication / 100.0
 
-            mi = (
-
-                171
+            # Os dois termos em log(loc) (5.2 + 16.2) somados em um so
 
-                - 5.2 * math.log(loc)
+            log_loc = math.log(loc)
 
-                - 0.23 * wmc
+            mi = 171 - 21.4 * log_loc - 0.23 * wmc - 50 * math.sqrt(dup)
 
-                - 16.2 * math.log(loc)
-
-                - 50 * math.sqrt(dup)
-
-            )
-
-            mi = max(0, min(100, mi))
+            mi = max(0.0, min(100.0, mi))
 
             return mi
 
@@ -1268,9 +1401,9 @@ class GitHubAnalyzer:
 
             # 3. Verifica se ha arquivos Java no repositorio
 
-            java_files = list(Path(repo_dir).rglob("*.java"))
+            # Um unico percurso do repositorio conta os arquivos e as linhas de codigo
 
-            total_java_files = len(java_files)
+            total_java_files, total_repo_loc = scan_java(repo_dir)
 
             result["total_java_files"] = total_java_files
 
@@ -1290,11 +1423,7 @@ class GitHubAnalyzer:
 
             print(f"   [+] PASSOU no filtro de arquivos: {total_java_files} >= {MIN_JAVA_FILES}")
 
-            # FILTRO 3: Calcula total de LOC e valida contra MIN_LOC
-
-            print(f"   [*] Calculando total de linhas de codigo (LOC)...")
-
-            total_repo_loc = count_total_loc(repo_dir)
+            # FILTRO 3: Valida o total de LOC contra MIN_LOC
 
             result["total_loc"] = total_repo_loc
 
@@ -1601,6 +1730,24 @@ class GitHubAnalyzer:
 
             print(f"   - Tempo maximo: {format_time(time_max)}")
 
+# Analisador de cada processo do pool de analise (criado uma vez por processo)
+
+worker_analyzer = None
+
+def init_analysis_worker(github_token: str):
+
+    """Cria o GitHubAnalyzer do processo, reaproveitado por todos os repositorios que ele analisar"""
+
+    global worker_analyzer
+
+    worker_analyzer = GitHubAnalyzer(github_token)
+
+def analyze_repository_worker(repo_info: Dict[str, Any]) -> Dict[str, Any]:
+
+    """Analisa um repositorio dentro de um processo do pool"""
+
+    return worker_analyzer.analyze_repository(repo_info)
+
 def main():
 
     """Funcao principal"""
@@ -1686,35 +1833,64 @@ def main():
 
     repos_testados = 0
 
-    for i, repo in enumerate(all_repos, 1):
+    # Cada processo clona e roda o CK de um repositorio enquanto os outros fazem o mesmo;
+    # os resultados sao consumidos na ordem da busca, entao a parada na meta nao muda
 
-        repos_testados += 1
+    with ProcessPoolExecutor(
 
-        print(f"\n[TENTATIVA {repos_testados}] Testando repositorio {i}/{len(all_repos)}...")
+        max_workers=ANALYSIS_WORKERS,
 
-        print(f"[STATUS] Repositorios validos: {len(results)}/{NUM_REPOS_VALIDOS}")
+        initializer=init_analysis_worker,
 
-        result = analyzer.analyze_repository(repo)
+        initargs=(GITHUB_TOKEN,),
 
-        if result["total_bugs"] > MIN_BUGS and result["total_java_files"] >= MIN_JAVA_FILES and result["total_loc"] >= MIN_LOC:
+    ) as executor:
 
-            results.append(result)
+        pending_analyses = deque()
 
-            print(f"\n[+] Repositorio {result['repository']} ACEITO")
+        next_repo = 0
 
-            print(f"    - Tempo: {format_time(result['analysis_time_seconds'])}")
+        while pending_analyses or next_repo < len(all_repos):
 
-            print(f"[+] Total: {len(results)}/{NUM_REPOS_VALIDOS}")
+            while next_repo < len(all_repos) and len(pending_analyses) < ANALYSIS_WORKERS:
 
-            if len(results) >= NUM_REPOS_VALIDOS:
+                pending_analyses.append(executor.submit(analyze_repository_worker, all_repos[next_repo]))
 
-                print(f"\n{'='*70}")
+                next_repo += 1
 
-                print(f"[+] META ALCANCADA! {NUM_REPOS_VALIDOS} validos encontrados.")
+            repos_testados += 1
 
-                print(f"{'='*70}")
+            print(f"\n[TENTATIVA {repos_testados}] Testando repositorio {repos_testados}/{len(all_repos)}...")
 
-                break
+            print(f"[STATUS] Repositorios validos: {len(results)}/{NUM_REPOS_VALIDOS}")
+
+            result = pending_analyses.popleft().result()
+
+            if result["total_bugs"] > MIN_BUGS and result["total_java_files"] >= MIN_JAVA_FILES and result["total_loc"] >= MIN_LOC:
+
+                results.append(result)
+
+                print(f"\n[+] Repositorio {result['repository']} ACEITO")
+
+                print(f"    - Tempo: {format_time(result['analysis_time_seconds'])}")
+
+                print(f"[+] Total: {len(results)}/{NUM_REPOS_VALIDOS}")
+
+                if len(results) >= NUM_REPOS_VALIDOS:
+
+                    print(f"\n{'='*70}")
+
+                    print(f"[+] META ALCANCADA! {NUM_REPOS_VALIDOS} validos encontrados.")
+
+                    print(f"{'='*70}")
+
+                    break
+
+        # Analises ainda nao iniciadas nao sao mais necessarias
+
+        for future in pending_analyses:
+
+            future.cancel()
 
     # Resultados
 
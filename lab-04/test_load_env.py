@@ -0,0 +1,34 @@
+"""
+Testes da leitura do arquivo .env (load_env / ENV_LINE_PATTERN)
+"""
+
+import os
+
+import main_pagination
+
+
+def test_valor_vazio_nao_engole_a_linha_seguinte():
+
+    pares = main_pagination.ENV_LINE_PATTERN.findall("GITHUB_TOKEN=\nOTHER=val\n")
+
+    assert pares == [("GITHUB_TOKEN", ""), ("OTHER", "val")]
+
+
+def test_load_env_ignora_comentarios_e_linhas_vazias(tmp_path, monkeypatch):
+
+    (tmp_path / ".env").write_text(
+        "# comentario=ignorado\n"
+        "\n"
+        "GITHUB_TOKEN=\n"
+        "  OTHER = \"val\"  \r\n"
+        "QUOTED='x y'\n",
+        encoding="utf-8",
+    )
+
+    monkeypatch.chdir(tmp_path)
+
+    monkeypatch.setattr(os, "environ", {})
+
+    main_pagination.load_env()
+
+    assert os.environ == {"GITHUB_TOKEN": "", "OTHER": "val", "QUOTED": "x y"}